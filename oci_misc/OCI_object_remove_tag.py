@@ -5,10 +5,10 @@
 #
 # Supported resource types:
 # - COMPUTE            : instance, custom image, boot volume
-# - BLOCK STORAGE      : block volume
+# - BLOCK STORAGE      : block volume, block volume backup
 # - DATABASE           : dbsystem, autonomous database, database, database home
-# - OBJECT STORAGE     : bucket
-# - NETWORKING         : vcn, subnet, security list
+# - NETWORKING         : vcn, subnet, route table, Internet gateway, DRG, network security group
+#                        security list, DHCP options, LPG, NAT gateway, service gateway
 # 
 # Note: OCI tenant and region given by an OCI CLI PROFILE
 # Author        : Christophe Pauliat
@@ -22,6 +22,11 @@
 #    2021-12-09: set OCI region according to the gived object ocid and not according to profile
 #    2021-12-09: Add support for Database Home
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: only catch OCI service errors (not found = 404) and retry get requests on throttling/server errors
+#    2026-10-16: use resource types table and OCI calls from shared module _oci_resources.py (bucket not supported)
+#    2026-10-16: retry all OCI requests (including update) on throttling and server errors
+#    2026-10-16: add -c/--bulk_compartment option (search tagged resources and remove tag from them in parallel)
+#    2026-10-16: ask for confirmation in bulk mode (unless -y/--yes) and display each result as soon as available
 #
 # TO DO: add support for more resource types
 # --------------------------------------------------------------------------------------------
@@ -30,9 +35,12 @@
 import oci
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from _oci_resources import resource_table, retry_strategy, parse_ocid, get_defined_tags, set_defined_tags
 
 # -------- variables
-configfile = "~/.oci/config"    # Define config file to be used.
+configfile  = "~/.oci/config"    # Define config file to be used.
+max_workers = 16                 # Max number of parallel API requests (bulk mode)
 
 # -------- functions
 
@@ -51,379 +59,59 @@ def usage():
     print ("region      = eu-frankfurt-1")
     exit (1)
 
-# ---- specific functions to remove tag keys from objects
-
-# -- compute
-def remove_tag_from_compute_instance(inst_id, ltag_ns, ltag_key):
-    ComputeClient = oci.core.ComputeClient(config)
-
-    # Get Defined-tags for the compute instance
-    try:
-        response = ComputeClient.get_instance(inst_id)
-        instance = response.data
-    except:
-        print ("ERROR 03: instance with OCID '{}' not found !".format(inst_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = instance.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this compute instance !")
-        exit (5)
-
-    # Update compute instance
-    try:
-        ComputeClient.update_instance(inst_id, oci.core.models.UpdateInstanceDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this compute instance !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-def remove_tag_from_custom_image(image_id, ltag_ns, ltag_key):
-    ComputeClient = oci.core.ComputeClient(config)
-
-    # Get Defined-tags for the custom image
-    try:
-        response = ComputeClient.get_image(image_id)
-        image = response.data
-    except:
-        print ("ERROR 03: custom image with OCID '{}' not found !".format(image_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = image.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this custom image !")
-        exit (5)
-
-    # Update custom image
-    try:
-        ComputeClient.update_image(image_id, oci.core.models.UpdateImageDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this custom image !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-def remove_tag_from_boot_volume(bootvol_id, ltag_ns, ltag_key):
-    BlockstorageClient = oci.core.BlockstorageClient(config)
-
-    # Get Defined-tags for the boot volume
-    try:
-        response = BlockstorageClient.get_boot_volume(bootvol_id)
-        bootvol = response.data
-    except:
-        print ("ERROR 03: boot volume with OCID '{}' not found !".format(bootvol_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = bootvol.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this boot volume !")
-        exit (5)
-
-    # Update boot volume
-    try:
-        BlockstorageClient.update_boot_volume(bootvol_id, oci.core.models.UpdateBootVolumeDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this boot volume !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-# -- block storage
-def remove_tag_from_block_volume(bkvol_id, ltag_ns, ltag_key):
-    BlockstorageClient = oci.core.BlockstorageClient(config)
-
-    # Get Defined-tags for the boot volume
+# ---- remove the tag key from a resource (the OCI region used is the one extracted from the resource OCID)
+# ---- returns the error message (None if no error) and the error code (0 if no error)
+def remove_tag(obj_id, ltag_ns, ltag_key):
+    # -- Get the resource type and the region from OCID
     try:
-        response = BlockstorageClient.get_volume(bkvol_id)
-        bkvol = response.data
-    except:
-        print ("ERROR 03: block volume with OCID '{}' not found !".format(bkvol_id))
-        exit (3)
+        obj_type, obj_region = parse_ocid(obj_id)
+    except ValueError:
+        return "ERROR 04: invalid OCID '{}' !".format(obj_id), 4
 
-    # Remove tag key from tag namespace
-    tags = bkvol.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this block volume !")
-        exit (5)
+    if obj_type not in resource_table:
+        return "SORRY: resource type {:s} is not yet supported by this script !".format(obj_type), 0
+    name = resource_table[obj_type].name
 
-    # Update boot volume
+    # -- Get Defined-tags for the resource
     try:
-        BlockstorageClient.update_volume(bkvol_id, oci.core.models.UpdateVolumeDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this block volume !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-# -- database
-def remove_tag_from_db_system(dbs_id, ltag_ns, ltag_key):
-    DatabaseClient = oci.database.DatabaseClient(config)
+        tags = get_defined_tags(config, obj_id, obj_type, obj_region)
+    except oci.exceptions.ServiceError as err:
+        if err.status != 404:
+            return "ERROR 07: cannot get tags of this {} !\n{}".format(name, err.message), 7
+        return "ERROR 03: {} with OCID '{}' not found !".format(name, obj_id), 3
 
-    # Get Defined-tags for the db system
-    try:
-        response = DatabaseClient.get_db_system(dbs_id)
-        dbs = response.data
-    except:
-        print ("ERROR 03: db system with OCID '{}' not found !".format(dbs_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = dbs.defined_tags
+    # -- Remove tag key from tag namespace
     try:
         del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this db system !")
-        exit (5)
+    except KeyError:
+        return "ERROR 05: this tag key does not exist for this {} !".format(name), 5
 
-    # Update db system
+    # -- Update the resource
     try:
-        DatabaseClient.update_db_system(dbs_id, oci.database.models.UpdateDbSystemDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this db system !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-def remove_tag_from_autonomous_db(adb_id, ltag_ns, ltag_key):
-    DatabaseClient = oci.database.DatabaseClient(config)
+        set_defined_tags(config, obj_id, obj_type, obj_region, tags)
+    except oci.exceptions.ServiceError as err:
+        return "ERROR 06: cannot remove this tag from this {} !\n{}".format(name, err.message), 6
 
-    # Get Defined-tags for the autonomous DB
-    try:
-        response = DatabaseClient.get_autonomous_database(adb_id)
-        adb = response.data
-    except:
-        print ("ERROR 03: Autonomous DB with OCID '{}' not found !".format(adb_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = adb.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this autonomous database !")
-        exit (5)
-
-    # Update autonomous DB
-    try:
-        DatabaseClient.update_autonomous_database(adb_id, oci.database.models.UpdateAutonomousDatabaseDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this autonomous DB !")
-        print (sys.exc_info()[1].message)
-        exit (6)
+    return None, 0
 
-def remove_tag_from_db(db_id, ltag_ns, ltag_key):
-    DatabaseClient = oci.database.DatabaseClient(config)
-
-    # Get Defined-tags for the DB
-    try:
-        response = DatabaseClient.get_database(db_id)
-        db = response.data
-    except:
-        print ("ERROR 03: DB with OCID '{}' not found !".format(db_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = db.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this database !")
-        exit (5)
-
-    # Update  DB
-    try:
-        DatabaseClient.update_database(db_id, oci.database.models.UpdateDatabaseDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this DB !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-def remove_tag_from_dbhome(dbh_id, ltag_ns, ltag_key):
-    DatabaseClient = oci.database.DatabaseClient(config)
-
-    # Get Defined-tags for the DB Home
-    try:
-        response = DatabaseClient.get_db_home(dbh_id)
-        dbh = response.data
-    except:
-        print ("ERROR 03: DB with OCID '{}' not found !".format(dbh_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = dbh.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this DB Home !")
-        exit (5)
-
-    # Update  DB Home
-    try:
-        DatabaseClient.update_db_home(dbh_id, oci.database.models.UpdateDbHomeDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this DB Home !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-
-# -- object storage
-def remove_tag_from_bucket(bucket_id, ltag_ns, ltag_key):
-    bucket_name = "HOW-TO-GET-IT-FROM-BUCKET-ID-?"
-
-    ObjectStorageClient = oci.object_storage.ObjectStorageClient(config)
-
-    # Get namespace
-    response = ObjectStorageClient.get_namespace()
-    namespace = response.data
-
-    # Get Defined-tags for the bucket
-    try:
-        response = ObjectStorageClient.get_bucket(namespace, bucket_name)
-        bucket = response.data
-    except:
-        print ("ERROR 03: Bucket with OCID '{}' not found !".format(bucket_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = bucket.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this bucket !")
-        exit (5)
-
-    # Update bucket
-    try:
-        ObjectStorageClient.update_bucket(namespace, bucket_id, oci.object_storage.models.UpdateBucketDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this bucket !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-# -- networking
-def remove_tag_from_vcn(vcn_id, ltag_ns, ltag_key):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    # Get Defined-tags for the VCN
-    try:
-        response = VirtualNetworkClient.get_vcn(vcn_id)
-        vcn = response.data
-    except:
-        print ("ERROR 03: VCN with OCID '{}' not found !".format(vcn_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = vcn.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this VCN !")
-        exit (5)
-
-    # Update VCN
-    try:
-        VirtualNetworkClient.update_vcn(vcn_id, oci.core.models.UpdateVcnDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this VCN !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-def remove_tag_from_subnet(subnet_id, ltag_ns, ltag_key):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    # Get Defined-tags for the subnet
-    try:
-        response = VirtualNetworkClient.get_subnet(subnet_id)
-        subnet = response.data
-    except:
-        print ("ERROR 03: Subnet with OCID '{}' not found !".format(subnet_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = subnet.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this subnet !")
-        exit (5)
-
-    # Update subnet
-    try:
-        VirtualNetworkClient.update_subnet(subnet_id, oci.core.models.UpdateSubnetDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this subnet !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-def remove_tag_from_security_list(seclist_id, ltag_ns, ltag_key):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    # Get Defined-tags for the security list
-    try:
-        response = VirtualNetworkClient.get_security_list(seclist_id)
-        seclist = response.data
-    except:
-        print ("ERROR 03: Security list with OCID '{}' not found !".format(seclist_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = seclist.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this security list !")
-        exit (5)
-
-    # Update security list
-    try:
-        VirtualNetworkClient.update_security_list(seclist_id, oci.core.models.UpdateSecurityListDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this security list !")
-        print (sys.exc_info()[1].message)
-        exit (6)
-
-def remove_tag_from_route_table(rt_id, ltag_ns, ltag_key):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    # Get Defined-tags for the route table
-    try:
-        response = VirtualNetworkClient.get_route_table(rt_id)
-        rt = response.data
-    except:
-        print ("ERROR 03: Route table with OCID '{}' not found !".format(rt_id))
-        exit (3)
-
-    # Remove tag key from tag namespace
-    tags = rt.defined_tags
-    try:
-        del tags[ltag_ns][ltag_key]
-    except:
-        print ("ERROR 05: this tag key does not exist for this route table !")
-        exit (5)
-
-    # Update route table
-    try:
-        VirtualNetworkClient.update_route_table(rt_id, oci.core.models.UpdateRouteTableDetails(defined_tags=tags))
-    except:
-        print ("ERROR 06: cannot remove this tag from this route table !")
-        print (sys.exc_info()[1].message)
-        exit (6)
+# ---- get the OCIDs of all resources of a compartment having the tag key (using OCI search service in the profile region)
+def search_tagged_resources(cpt_id, ltag_ns, ltag_key):
+    query = "query all resources where (definedTags.namespace = '{:s}' && definedTags.key = '{:s}') && compartmentId = '{:s}'".format(ltag_ns, ltag_key, cpt_id)
+    SearchClient = oci.resource_search.ResourceSearchClient(config, retry_strategy=retry_strategy)
+    response = oci.pagination.list_call_get_all_results(SearchClient.search_resources, oci.resource_search.models.StructuredSearchDetails(type="Structured", query=query))
+    return [ resource.identifier for resource in response.data ]
 
 # -------- main
 
 # -- parse arguments
-parser = argparse.ArgumentParser(description = "Remove a defined tag from an OCI resource")
+parser = argparse.ArgumentParser(description = "Remove a defined tag from an OCI resource (or from all resources of a compartment)")
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
-parser.add_argument("-id", "--resource_ocid", help="Resource OCID", required=True)
+group = parser.add_mutually_exclusive_group(required=True)
+group.add_argument("-id", "--resource_ocid", help="Resource OCID")
+group.add_argument("-c", "--bulk_compartment", help="Compartment OCID: remove the tag from all resources of this compartment having it")
 parser.add_argument("-n", "--tag_ns", help="Tag namespace", required=True)
 parser.add_argument("-k", "--tag_key", help="Tag key", required=True)
+parser.add_argument("-y", "--yes", help="Do not ask for confirmation before removing the tag (bulk mode)", action="store_true")
 args = parser.parse_args()
 
 profile     = args.profile
@@ -438,35 +126,37 @@ except:
     print ("ERROR 02: profile '{}' not found in config file {} !".format(profile,configfile))
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
-# -- Get the resource type from OCID
-obj_type = obj_id.split(".")[1].lower()
-# Set the working region to the region extracted from the ocid
-obj_region = obj_id.split(".")[3].lower()
-config["region"] = obj_region
-
-# compute
-if   obj_type == "instance":           remove_tag_from_compute_instance(obj_id, tag_ns, tag_key)
-elif obj_type == "image":              remove_tag_from_custom_image(obj_id, tag_ns, tag_key)
-elif obj_type == "bootvolume":         remove_tag_from_boot_volume(obj_id, tag_ns, tag_key)
-# block storage
-elif obj_type == "volume":             remove_tag_from_block_volume(obj_id, tag_ns, tag_key)
-# database
-elif obj_type == "dbsystem":           remove_tag_from_db_system(obj_id, tag_ns, tag_key)
-elif obj_type == "autonomousdatabase": remove_tag_from_autonomous_db(obj_id, tag_ns, tag_key)
-elif obj_type == "database":           remove_tag_from_db(obj_id, tag_ns, tag_key)
-elif obj_type == "dbhome":             remove_tag_from_dbhome(obj_id, tag_ns, tag_key)
-# object storage
-elif obj_type == "bucket":             remove_tag_from_bucket(obj_id, tag_ns, tag_key)
-# networking
-elif obj_type == "vcn":                remove_tag_from_vcn(obj_id, tag_ns, tag_key)
-elif obj_type == "subnet":             remove_tag_from_subnet(obj_id, tag_ns, tag_key)
-elif obj_type == "securitylist":       remove_tag_from_security_list(obj_id, tag_ns, tag_key)
-elif obj_type == "routetable":         remove_tag_from_route_table(obj_id, tag_ns, tag_key)
-else: print ("SORRY: resource type {:s} is not yet supported by this script !".format(obj_type)) 
+# -- Remove the tag from a single resource
+if obj_id:
+    text, error = remove_tag(obj_id, tag_ns, tag_key)
+    if text:
+        print (text)
+    exit (error)
+
+# -- Remove the tag from all resources of the compartment having it (in parallel)
+obj_ids = search_tagged_resources(args.bulk_compartment, tag_ns, tag_key)
+print ("{} resource(s) found with tag key {}.{}".format(len(obj_ids), tag_ns, tag_key))
+if len(obj_ids) == 0:
+    exit (0)
+for obj_id in obj_ids:
+    print ("- {}".format(obj_id))
+
+# -- Ask to confirm removal (unless -y)
+if not args.yes:
+    print ("")
+    answer = input ("Do you confirm removal of this tag from those resources ? (y/n): ")
+    if answer != "y":
+        print ("Removal not confirmed. Exiting !")
+        exit (8)
+
+# -- Display the result for each resource as soon as it is available
+error_code = 0
+with ThreadPoolExecutor(max_workers = max_workers) as executor:
+    futures = { executor.submit(remove_tag, obj_id, tag_ns, tag_key): obj_id for obj_id in obj_ids }
+    for future in as_completed(futures):
+        text, error = future.result()
+        print ("{}: {}".format(futures[future], text if text else "tag removed"), flush=True)
+        error_code = max(error_code, error)
 
 # -- the end
-exit (0)
+exit (error_code)
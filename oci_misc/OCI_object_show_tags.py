@@ -7,7 +7,6 @@
 # - COMPUTE            : instance, custom image, boot volume
 # - BLOCK STORAGE      : block volume, block volume backup
 # - DATABASE           : dbsystem, autonomous database, database, database home
-# - OBJECT STORAGE     : bucket
 # - NETWORKING         : vcn, subnet, route table, Internet gateway, DRG, network security group
 #                        security list, DHCP options, LPG, NAT gateway, service gateway
 # 
@@ -23,6 +22,13 @@
 #    2021-12-09: set OCI region according to the gived object ocid and not according to profile
 #    2021-12-09: Add support for Database Home
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: use a dispatch table and reuse OCI clients instead of 1 function per resource type
+#    2026-10-16: share the same HTTPS session (connections pool) between all OCI clients
+#    2026-10-16: accept several OCIDs (-id or -f file) and get their tags in parallel
+#    2026-10-16: only catch OCI service errors (not found = 404) and retry get requests on throttling/server errors
+#    2026-10-16: move resource types table and OCI calls to shared module _oci_resources.py (bucket not supported)
+#    2026-10-16: retry all OCI requests on throttling and server errors
+#    2026-10-16: report other OCI service errors per resource instead of stopping
 #
 # TO DO: add support for more resource types
 # ----------------------------------------------------------------------------------------------------------
@@ -31,9 +37,12 @@
 import oci
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from _oci_resources import resource_table, parse_ocid, get_defined_tags
 
 # -------- variables
-configfile = "~/.oci/config"    # Define config file to be used.
+configfile  = "~/.oci/config"    # Define config file to be used.
+max_workers = 16                 # Max number of parallel API requests
 
 # -------- functions
 
@@ -52,261 +61,45 @@ def usage():
     print ("region      = eu-frankfurt-1")
     exit (1)
 
-# ---- specific functions to show tags for objects
-
-# -- compute
-def show_tags_from_compute_instance(inst_id):
-    ComputeClient = oci.core.ComputeClient(config)
-
-    try:
-        response = ComputeClient.get_instance(inst_id)
-        instance = response.data
-        print (instance.defined_tags)
-    except:
-        print ("ERROR 03: instance with OCID '{}' not found !".format(inst_id))
-        exit (3)
-
-def show_tags_from_custom_image(image_id):
-    ComputeClient = oci.core.ComputeClient(config)
-
-    try:
-        response = ComputeClient.get_image(image_id)
-        image = response.data
-        print (image.defined_tags)
-    except:
-        print ("ERROR 03: custom image with OCID '{}' not found !".format(image_id))
-        exit (3)
-
-def show_tags_from_boot_volume(bootvol_id):
-    BlockstorageClient = oci.core.BlockstorageClient(config)
-
-    try:
-        response = BlockstorageClient.get_boot_volume(bootvol_id)
-        bootvol = response.data
-        print (bootvol.defined_tags)
-    except:
-        print ("ERROR 03: boot volume with OCID '{}' not found !".format(bootvol_id))
-        exit (3)
-
-# -- block storage
-def show_tags_from_block_volume(bkvol_id):
-    BlockstorageClient = oci.core.BlockstorageClient(config)
-
-    try:
-        response = BlockstorageClient.get_volume(bkvol_id)
-        bkvol = response.data
-        print (bkvol.defined_tags)
-    except:
-        print ("ERROR 03: block volume with OCID '{}' not found !".format(bkvol_id))
-        exit (3)
-
-def show_tags_from_block_volume_backup(bkvolbkup_id):
-    BlockstorageClient = oci.core.BlockstorageClient(config)
-
-    try:
-        response = BlockstorageClient.get_volume_backup(bkvolbkup_id)
-        bkvol_bkup = response.data
-        print (bkvol_bkup.defined_tags)
-    except:
-        print ("ERROR 03: block volume backup with OCID '{}' not found !".format(bkvolbkup_id))
-        exit (3)
-
-# -- database
-def show_tags_from_db_system(dbs_id):
-    DatabaseClient = oci.database.DatabaseClient(config)
-
+# ---- get tags for an object (the OCI region used is the one extracted from the object OCID)
+def lookup_one(obj_id):
     try:
-        response = DatabaseClient.get_db_system(dbs_id)
-        dbs = response.data
-        print (dbs.defined_tags)
-    except:
-        print ("ERROR 03: db system with OCID '{}' not found !".format(dbs_id))
-        exit (3)
+        obj_type, obj_region = parse_ocid(obj_id)
+    except ValueError:
+        return "ERROR 05: invalid OCID '{}' !".format(obj_id), 5
 
-def show_tags_from_autonomous_db(adb_id):
-    DatabaseClient = oci.database.DatabaseClient(config)
+    if obj_type not in resource_table:
+        return "SORRY: resource type {:s} is not yet supported by this script !".format(obj_type), 0
 
     try:
-        response = DatabaseClient.get_autonomous_database(adb_id)
-        adb = response.data
-        print (adb.defined_tags)
-    except:
-        print ("ERROR 03: Autonomous DB with OCID '{}' not found !".format(adb_id))
-        exit (3)
-
-def show_tags_from_db(db_id):
-    DatabaseClient = oci.database.DatabaseClient(config)
-
-    try:
-        response = DatabaseClient.get_database(db_id)
-        db = response.data
-        print (db.defined_tags)
-    except:
-        print ("ERROR 03: DB with OCID '{}' not found !".format(db_id))
-        exit (3)
-
-def show_tags_from_dbhome(dbh_id):
-    DatabaseClient = oci.database.DatabaseClient(config)
-
-    try:
-        response = DatabaseClient.get_db_home(dbh_id)
-        dbh = response.data
-        print (dbh.defined_tags)
-    except:
-        print ("ERROR 03: DB Home with OCID '{}' not found !".format(dbh_id))
-        exit (3)
-
-
-# -- object storage     # DOES NOT WORK
-def show_tags_from_bucket(bucket_id):
-    bucket_name = "HOW-TO-GET-IT-FROM-BUCKET-ID-?"
-
-    ObjectStorageClient = oci.object_storage.ObjectStorageClient(config)
-
-    # Get namespace
-    response = ObjectStorageClient.get_namespace()
-    namespace = response.data
-
-    try:
-        response = ObjectStorageClient.get_bucket(namespace, bucket_name)
-        bucket = response.data
-        print (bucket.defined_tags)
-    except:
-        print ("ERROR 03: Bucket with OCID '{}' not found !".format(bucket_id))
-        exit (3)
-
-# -- networking
-def show_tags_from_vcn(vcn_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_vcn(vcn_id)
-        vcn = response.data
-        print (vcn.defined_tags)
-    except:
-        print ("ERROR 03: VCN with OCID '{}' not found !".format(vcn_id))
-        exit (3)
-
-def show_tags_from_subnet(subnet_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_subnet(subnet_id)
-        subnet = response.data
-        print (subnet.defined_tags)
-    except:
-        print ("ERROR 03: Subnet with OCID '{}' not found !".format(subnet_id))
-        exit (3)
-
-def show_tags_from_route_table(rt_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_route_table(rt_id)
-        rt = response.data
-        print (rt.defined_tags)
-    except:
-        print ("ERROR 03: Route table with OCID '{}' not found !".format(rt_id))
-        exit (3)
-
-def show_tags_from_internet_gateway(ig_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_internet_gateway(ig_id)
-        ig = response.data
-        print (ig.defined_tags)
-    except:
-        print ("ERROR 03: Internet gateway with OCID '{}' not found !".format(ig_id))
-        exit (3)
-
-def show_tags_from_dynamic_routing_gateway(drg_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_drg(drg_id)
-        drg = response.data
-        print (drg.defined_tags)
-    except:
-        print ("ERROR 03: Dynamic routing gateway with OCID '{}' not found !".format(drg_id))
-        exit (3)
-
-def show_tags_from_network_security_group(nsg_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_network_security_group(nsg_id)
-        nsg = response.data
-        print (nsg.defined_tags)
-    except:
-        print ("ERROR 03: Network security group with OCID '{}' not found !".format(nsg_id))
-        exit (3)
-
-def show_tags_from_security_list(seclist_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_security_list(seclist_id)
-        seclist = response.data
-        print (seclist.defined_tags)
-    except:
-        print ("ERROR 03: Security list with OCID '{}' not found !".format(seclist_id))
-        exit (3)
-
-def show_tags_from_dhcp_options(do_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_dhcp_options(do_id)
-        do = response.data
-        print (do.defined_tags)
-    except:
-        print ("ERROR 03: DHCP options with OCID '{}' not found !".format(do_id))
-        exit (3)
-
-def show_tags_from_local_peering_gateway(lpg_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_local_peering_gateway(lpg_id)
-        lpg = response.data
-        print (lpg.defined_tags)
-    except:
-        print ("ERROR 03: Local peering gateway with OCID '{}' not found !".format(lpg_id))
-        exit (3)
-
-def show_tags_from_nat_gateway(ng_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_nat_gateway(ng_id)
-        ng = response.data
-        print (ng.defined_tags)
-    except:
-        print ("ERROR 03: NAT gateway with OCID '{}' not found !".format(ng_id))
-        exit (3)
-
-def show_tags_from_service_gateway(sg_id):
-    VirtualNetworkClient = oci.core.VirtualNetworkClient(config)
-
-    try:
-        response = VirtualNetworkClient.get_service_gateway(sg_id)
-        sg = response.data
-        print (sg.defined_tags)
-    except:
-        print ("ERROR 03: Service gateway with OCID '{}' not found !".format(sg_id))
-        exit (3)
+        return str(get_defined_tags(config, obj_id, obj_type, obj_region)), 0
+    except oci.exceptions.ServiceError as err:
+        if err.status != 404:
+            return "ERROR 07: cannot get tags of this {} !\n{}".format(resource_table[obj_type].name, err.message), 7
+        return "ERROR 03: {} with OCID '{}' not found !".format(resource_table[obj_type].name, obj_id), 3
 
 # -------- main
 
 # -- parse arguments
-parser = argparse.ArgumentParser(description = "Show defined tags for an OCI resource")
+parser = argparse.ArgumentParser(description = "Show defined tags for one or several OCI resources")
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
-parser.add_argument("-id", "--resource_ocid", help="Resource OCID", required=True)
+group = parser.add_mutually_exclusive_group(required=True)
+group.add_argument("-id", "--resource_ocid", help="Resource OCID(s)", nargs="+")
+group.add_argument("-f", "--ocids_file", help="File containing resource OCIDs (1 per line)")
 args = parser.parse_args()
 
 profile     = args.profile
-obj_id      = args.resource_ocid
+
+# -- get the list of resource OCIDs
+if args.ocids_file:
+    try:
+        with open(args.ocids_file, "r") as filein:
+            obj_ids = [ line.strip() for line in filein if line.strip() and not line.startswith("#") ]
+    except OSError as err:
+        print ("ERROR 04: cannot read file {} ({}) !".format(args.ocids_file,err))
+        exit (4)
+else:
+    obj_ids = args.resource_ocid
 
 # -- load profile from config file
 try:
@@ -315,43 +108,18 @@ except:
     print ("ERROR 02: profile '{}' not found in config file {} !".format(profile,configfile))
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
-# -- Get the resource type from OCID
-obj_type = obj_id.split(".")[1].lower()
-# Set the working region to the region extracted from the ocid
-obj_region = obj_id.split(".")[3].lower()
-config["region"] = obj_region
+# -- get tags for all resources in parallel
+with ThreadPoolExecutor(max_workers = max_workers) as executor:
+    results = list(executor.map(lookup_one, obj_ids))
 
-# compute
-if   obj_type == "instance":             show_tags_from_compute_instance(obj_id)
-elif obj_type == "image":                show_tags_from_custom_image(obj_id)
-elif obj_type == "bootvolume":           show_tags_from_boot_volume(obj_id)
-# block storage
-elif obj_type == "volume":               show_tags_from_block_volume(obj_id)
-elif obj_type == "volumebackup":         show_tags_from_block_volume_backup(obj_id)
-# database
-elif obj_type == "dbsystem":             show_tags_from_db_system(obj_id)
-elif obj_type == "autonomousdatabase":   show_tags_from_autonomous_db(obj_id)
-elif obj_type == "database":             show_tags_from_db(obj_id)
-elif obj_type == "dbhome":               show_tags_from_dbhome(obj_id)
-# object storage
-elif obj_type == "bucket":               show_tags_from_bucket(obj_id)
-# networking
-elif obj_type == "vcn":                  show_tags_from_vcn(obj_id)
-elif obj_type == "subnet":               show_tags_from_subnet(obj_id)
-elif obj_type == "routetable":           show_tags_from_route_table(obj_id)
-elif obj_type == "internetgateway":      show_tags_from_internet_gateway(obj_id)
-elif obj_type == "drg":                  show_tags_from_dynamic_routing_gateway(obj_id)
-elif obj_type == "networksecuritygroup": show_tags_from_network_security_group(obj_id)
-elif obj_type == "securitylist":         show_tags_from_security_list(obj_id)
-elif obj_type == "dhcpoptions":          show_tags_from_dhcp_options(obj_id)
-elif obj_type == "localpeeringgateway":  show_tags_from_local_peering_gateway(obj_id)
-elif obj_type == "natgateway":           show_tags_from_nat_gateway(obj_id)
-elif obj_type == "servicegateway":       show_tags_from_service_gateway(obj_id)
-else: print ("SORRY: resource type {:s} is not yet supported by this script !".format(obj_type)) 
+# -- display results (with the OCID as prefix if several resources)
+error_code = 0
+for obj_id, (text, error) in zip(obj_ids, results):
+    if len(obj_ids) > 1:
+        print ("{}: {}".format(obj_id, text))
+    else:
+        print (text)
+    error_code = max(error_code, error)
 
 # -- the end
-exit (0)
+exit (error_code)
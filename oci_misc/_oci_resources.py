@@ -0,0 +1,121 @@
+# ----------------------------------------------------------------------------------------------------------
+# Shared module (not a script) used by OCI_object_show_tags.py and OCI_object_remove_tag.py
+# to get and update the defined tags of an OCI resource/object from its OCID
+#
+# Supported resource types:
+# - COMPUTE            : instance, custom image, boot volume
+# - BLOCK STORAGE      : block volume, block volume backup
+# - DATABASE           : dbsystem, autonomous database, database, database home
+# - NETWORKING         : vcn, subnet, route table, Internet gateway, DRG, network security group
+#                        security list, DHCP options, LPG, NAT gateway, service gateway
+#
+# Author        : Christophe Pauliat
+# Platforms     : MacOS / Linux
+#
+# prerequisites : - Python 3 with OCI Python SDK installed
+# Versions
+#    2026-10-16: Initial Version (code moved from OCI_object_show_tags.py and OCI_object_remove_tag.py)
+#    2026-10-16: retry update requests too on throttling and server errors
+# ----------------------------------------------------------------------------------------------------------
+
+# -------- import
+import oci
+import threading
+from collections import namedtuple
+
+# -------- variables
+clients      = {}                 # OCI clients already created (1 per client class and region)
+clients_lock = threading.Lock()   # Lock to create OCI clients from parallel threads
+session      = None               # HTTPS session shared by all OCI clients
+pool_size    = 20                 # Size of the HTTPS connections pool of the shared session
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
+
+# -- client class, get and update methods, update details class and name for each supported resource type
+ResourceOps = namedtuple("ResourceOps", ["client_class", "get_method", "update_method", "update_details_class", "name"])
+
+resource_table = {
+    # compute
+    "instance":             ResourceOps(oci.core.ComputeClient,        "get_instance",               "update_instance",
+                                        oci.core.models.UpdateInstanceDetails,             "compute instance"),
+    "image":                ResourceOps(oci.core.ComputeClient,        "get_image",                  "update_image",
+                                        oci.core.models.UpdateImageDetails,                "custom image"),
+    "bootvolume":           ResourceOps(oci.core.BlockstorageClient,   "get_boot_volume",            "update_boot_volume",
+                                        oci.core.models.UpdateBootVolumeDetails,           "boot volume"),
+    # block storage
+    "volume":               ResourceOps(oci.core.BlockstorageClient,   "get_volume",                 "update_volume",
+                                        oci.core.models.UpdateVolumeDetails,               "block volume"),
+    "volumebackup":         ResourceOps(oci.core.BlockstorageClient,   "get_volume_backup",          "update_volume_backup",
+                                        oci.core.models.UpdateVolumeBackupDetails,         "block volume backup"),
+    # database
+    "dbsystem":             ResourceOps(oci.database.DatabaseClient,   "get_db_system",              "update_db_system",
+                                        oci.database.models.UpdateDbSystemDetails,         "db system"),
+    "autonomousdatabase":   ResourceOps(oci.database.DatabaseClient,   "get_autonomous_database",    "update_autonomous_database",
+                                        oci.database.models.UpdateAutonomousDatabaseDetails, "Autonomous DB"),
+    "database":             ResourceOps(oci.database.DatabaseClient,   "get_database",               "update_database",
+                                        oci.database.models.UpdateDatabaseDetails,         "DB"),
+    "dbhome":               ResourceOps(oci.database.DatabaseClient,   "get_db_home",                "update_db_home",
+                                        oci.database.models.UpdateDbHomeDetails,           "DB Home"),
+    # networking
+    "vcn":                  ResourceOps(oci.core.VirtualNetworkClient, "get_vcn",                    "update_vcn",
+                                        oci.core.models.UpdateVcnDetails,                  "VCN"),
+    "subnet":               ResourceOps(oci.core.VirtualNetworkClient, "get_subnet",                 "update_subnet",
+                                        oci.core.models.UpdateSubnetDetails,               "Subnet"),
+    "routetable":           ResourceOps(oci.core.VirtualNetworkClient, "get_route_table",            "update_route_table",
+                                        oci.core.models.UpdateRouteTableDetails,           "Route table"),
+    "internetgateway":      ResourceOps(oci.core.VirtualNetworkClient, "get_internet_gateway",       "update_internet_gateway",
+                                        oci.core.models.UpdateInternetGatewayDetails,      "Internet gateway"),
+    "drg":                  ResourceOps(oci.core.VirtualNetworkClient, "get_drg",                    "update_drg",
+                                        oci.core.models.UpdateDrgDetails,                  "Dynamic routing gateway"),
+    "networksecuritygroup": ResourceOps(oci.core.VirtualNetworkClient, "get_network_security_group", "update_network_security_group",
+                                        oci.core.models.UpdateNetworkSecurityGroupDetails, "Network security group"),
+    "securitylist":         ResourceOps(oci.core.VirtualNetworkClient, "get_security_list",          "update_security_list",
+                                        oci.core.models.UpdateSecurityListDetails,         "Security list"),
+    "dhcpoptions":          ResourceOps(oci.core.VirtualNetworkClient, "get_dhcp_options",           "update_dhcp_options",
+                                        oci.core.models.UpdateDhcpDetails,                 "DHCP options"),
+    "localpeeringgateway":  ResourceOps(oci.core.VirtualNetworkClient, "get_local_peering_gateway",  "update_local_peering_gateway",
+                                        oci.core.models.UpdateLocalPeeringGatewayDetails,  "Local peering gateway"),
+    "natgateway":           ResourceOps(oci.core.VirtualNetworkClient, "get_nat_gateway",            "update_nat_gateway",
+                                        oci.core.models.UpdateNatGatewayDetails,           "NAT gateway"),
+    "servicegateway":       ResourceOps(oci.core.VirtualNetworkClient, "get_service_gateway",        "update_service_gateway",
+                                        oci.core.models.UpdateServiceGatewayDetails,       "Service gateway"),
+}
+
+# -------- functions
+
+# ---- get resource type and region from an OCID (ocid1.<type>.<realm>.<region>.<unique id>)
+# ---- using the positions of the first 4 dots (no list of substrings created)
+# ---- raises ValueError if the OCID is invalid
+def parse_ocid(obj_id):
+    dot1 = obj_id.index(".")
+    dot2 = obj_id.index(".", dot1+1)
+    dot3 = obj_id.index(".", dot2+1)
+    dot4 = obj_id.index(".", dot3+1)
+    return obj_id[dot1+1:dot2].lower(), obj_id[dot3+1:dot4].lower()
+
+# ---- get an OCI client for the given client class and region (only 1 client created per client class and region)
+# ---- all clients share the same HTTPS session (and connections pool) so that connections are reused
+def get_client(config, client_class, region):
+    global session
+    with clients_lock:
+        if (client_class, region) not in clients:
+            client = client_class({**config, "region": region})
+            if session is None:
+                session = client.base_client.session
+                adapter = session.get_adapter("https://")
+                session.mount("https://", type(adapter)(pool_connections=pool_size, pool_maxsize=pool_size))
+            else:
+                client.base_client.session = session
+            clients[(client_class, region)] = client
+        return clients[(client_class, region)]
+
+# ---- get the defined tags of a resource (resource type must exist in resource_table)
+def get_defined_tags(config, obj_id, obj_type, region):
+    ops    = resource_table[obj_type]
+    client = get_client(config, ops.client_class, region)
+    return getattr(client, ops.get_method)(obj_id, retry_strategy=retry_strategy).data.defined_tags
+
+# ---- replace the defined tags of a resource (resource type must exist in resource_table)
+def set_defined_tags(config, obj_id, obj_type, region, tags):
+    ops    = resource_table[obj_type]
+    client = get_client(config, ops.client_class, region)
+    getattr(client, ops.update_method)(obj_id, ops.update_details_class(defined_tags=tags), retry_strategy=retry_strategy)
@@ -82,10 +82,6 @@ except:
     print ("ERROR 02: profile '{}' not found in config file {} !".format(profile,configfile))
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
 # -- Get the list of objects stored in the bucket
 ObjectStorageClient = oci.object_storage.ObjectStorageClient(config)
 namespace = ObjectStorageClient.get_namespace().data
@@ -25,6 +25,7 @@ import oci
 import sys
 import operator
 import argparse
+from functools import lru_cache
 
 # -------- colors for output
 # see https://misc.flogisoft.com/bash/tip_colors_and_formatting to customize
@@ -80,23 +81,20 @@ def disable_colored_output():
     COLOR_NORMAL=""
 
 # ---- Get the complete name of a compartment from its id, including parent and grand-parent..
+@lru_cache(maxsize=None)
 def get_cpt_name_from_id(cpt_id):
-
     if cpt_id == RootCompartmentID:
         return "root"
 
-    name=""
-    for c in compartments:
-        if (c.id == cpt_id):
-            name=c.name
-
-            # if the cpt is a direct child of root compartment, return name
-            if c.compartment_id == RootCompartmentID:
-                return name
-            # otherwise, find name of parent and add it as a prefix to name
-            else:
-                name = get_cpt_name_from_id(c.compartment_id)+":"+name
-                return name
+    # walk up the compartments tree until root compartment
+    names = []
+    while cpt_id != RootCompartmentID:
+        c = cpt_by_id.get(cpt_id)
+        if c is None:
+            break
+        names.append(c.name)
+        cpt_id = c.compartment_id
+    return ":".join(reversed(names))
 
 # ---- Build the block storage report for one region then display it
 def get_report_for_region():
@@ -119,23 +117,23 @@ def get_report_for_region():
 
     # Run the search query to get list of bucket then for each bucket, use get_bucket() to get approximate size
     # Finally store the result in a dictionary
-    response = SearchClient.search_resources(oci.resource_search.models.StructuredSearchDetails(type="Structured", query=query_bucket))
-    for item in response.data.items:
-        # ignore terminated buckets and internal buckets ('#' in the name)
-        if item.lifecycle_state != "TERMINATED" and not '#' in item.display_name:
-            # as size is not returned by the query search, we need to get the size (approximate) of each bucket.
-            my_fields = [ 'approximateSize' ]
-            response2 = OSClient.get_bucket(namespace, item.display_name, fields=my_fields)
-            bucket = response2.data
-            if bucket.approximate_size != None:
-                if mb_used.get(item.compartment_id) == None:
-                    mb_used[item.compartment_id] = int(bucket.approximate_size / 1024 / 1024)
-                else:
-                    mb_used[item.compartment_id] += int(bucket.approximate_size / 1024 / 1024)
-                # if details:
-                #     cpt_name = get_cpt_name_from_id(bucket.compartment_id)
-                #     print (f"- {bucket.approximate_size / 1024 / 1024 / 1024:7.1f} GBs, {bucket.name:30s}, {cpt_name}")
-                total_mb_used += int(bucket.approximate_size / 1024 / 1024)
+    # Search results are processed page by page to avoid keeping all buckets in memory
+    search_details = oci.resource_search.models.StructuredSearchDetails(type="Structured", query=query_bucket)
+    for response in oci.pagination.list_call_get_all_results_generator(SearchClient.search_resources, 'response', search_details):
+        for item in response.data.items:
+            # ignore terminated buckets and internal buckets ('#' in the name)
+            if item.lifecycle_state != "TERMINATED" and not '#' in item.display_name:
+                # as size is not returned by the query search, we need to get the size (approximate) of each bucket.
+                my_fields = [ 'approximateSize' ]
+                response2 = OSClient.get_bucket(namespace, item.display_name, fields=my_fields)
+                bucket = response2.data
+                if bucket.approximate_size != None:
+                    mb = int(bucket.approximate_size / 1024 / 1024)
+                    mb_used[item.compartment_id] = mb_used.get(item.compartment_id, 0) + mb
+                    # if details:
+                    #     cpt_name = get_cpt_name_from_id(bucket.compartment_id)
+                    #     print (f"- {bucket.approximate_size / 1024 / 1024 / 1024:7.1f} GBs, {bucket.name:30s}, {cpt_name}")
+                    total_mb_used += mb
 
     # sort the dictionary by descending total size 
     mb_used_sorted = dict(sorted(mb_used.items(), key=operator.itemgetter(1), reverse=True))
@@ -173,8 +171,7 @@ except:
     exit (2)
 
 IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
+RootCompartmentID = config['tenancy']
 
 # -- get list of subscribed regions
 response = oci.pagination.list_call_get_all_results(IdentityClient.list_region_subscriptions, RootCompartmentID)
@@ -183,6 +180,7 @@ regions = response.data
 # -- Get list of compartments with all sub-compartments
 response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,RootCompartmentID,compartment_id_in_subtree=True)
 compartments = response.data
+cpt_by_id    = { c.id: c for c in compartments }
 
 # -- Build and print object storage reports for regions
 if not(all_regions):
@@ -12,6 +12,7 @@
 # Versions
 #    2020-15-12: Initial Version
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: use -n instead of -p for --par option (-p already used by --profile)
 # --------------------------------------------------------------------------------------------------------------------------
 
 # -------- import
@@ -22,12 +23,13 @@ import argparse
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
+ACCESS_TYPES = { "R": "ObjectRead", "W": "ObjectWrite", "RW": "ObjectReadWrite" }
 
 # -------- functions
 
 # ---- usage syntax
 def usage():
-    print ("Usage: {} -p OCI_PROFILE -b bucket_name -o object_name -p par_name -t type -d days_from_now".format(sys.argv[0]))
+    print ("Usage: {} -p OCI_PROFILE -b bucket_name -o object_name -n par_name -t type -d days_from_now".format(sys.argv[0]))
     print ("")
     print ("Notes:")
     print ("- type values: R for Read, W for Write or RW for ReadWrite")
@@ -51,7 +53,7 @@ parser = argparse.ArgumentParser(description = "Create a PAR for an object in a
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
 parser.add_argument("-b", "--bucket", help="Bucket name", required=True)
 parser.add_argument("-o", "--object", help="Object name", required=True)
-parser.add_argument("-p", "--par", help="Pre-authenticated request name", required=True)
+parser.add_argument("-n", "--par", help="Pre-authenticated request name", required=True)
 parser.add_argument("-t", "--type", help="R for Read, W for Write or RW for Read/Write", required=True, choices=['R','W','RW'])
 parser.add_argument("-d", "--days", help="Pre-authenticated request validity in number of days", required=True)
 args = parser.parse_args()
@@ -70,21 +72,12 @@ except:
     print ("ERROR 02: profile '{}' not found in config file {} !".format(profile,configfile))
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
 # -- Get the preauth requests for the bucket
 ObjectStorageClient = oci.object_storage.ObjectStorageClient(config)
 namespace = ObjectStorageClient.get_namespace().data
 
 # -- Create a PAR
-if type.upper() == "R":
-    access_type = "ObjectRead"
-elif type.upper() == "W":
-    access_type = "ObjectWrite"
-elif type.upper() == "RW":
-    access_type = "ObjectReadWrite"
+access_type = ACCESS_TYPES[type.upper()]
 
 now = datetime.datetime.now(datetime.timezone.utc)
 exp_time = now + datetime.timedelta(days=int(days_fnow))
@@ -62,15 +62,11 @@ except:
     print ("ERROR 02: profile '{}' not found in config file {} !".format(profile,configfile))
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
 # -- Get the preauth requests for the bucket
 ObjectStorageClient = oci.object_storage.ObjectStorageClient(config)
 namespace = ObjectStorageClient.get_namespace().data
 try:
-    response = oci.pagination.list_call_get_all_results(ObjectStorageClient.list_preauthenticated_requests, namespace_name=namespace, bucket_name=bucket)
+    response = oci.pagination.list_call_get_all_results(ObjectStorageClient.list_preauthenticated_requests, namespace_name=namespace, bucket_name=bucket, retry_strategy=oci.retry.NoneRetryStrategy())
 except:
     print ("ERROR 04: bucket {} not found !".format(bucket))
     exit (4)
@@ -14,6 +14,7 @@
 #    2020-03-25: Initial Version
 #    2022-01-03: use argparse to parse arguments
 #    2022-01-04: add --no_color option
+#    2026-10-16: sort PARs in active and expired lists in a single pass
 # --------------------------------------------------------------------------------------------------------------------------
 
 # -------- import
@@ -84,15 +85,11 @@ except:
     print ("ERROR 02: profile '{}' not found in config file {} !".format(profile,configfile))
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
 # -- Get the preauth requests for the bucket
 ObjectStorageClient = oci.object_storage.ObjectStorageClient(config)
 namespace = ObjectStorageClient.get_namespace().data
 try:
-    response = oci.pagination.list_call_get_all_results(ObjectStorageClient.list_preauthenticated_requests, namespace_name=namespace, bucket_name=bucket)
+    response = oci.pagination.list_call_get_all_results(ObjectStorageClient.list_preauthenticated_requests, namespace_name=namespace, bucket_name=bucket, retry_strategy=oci.retry.NoneRetryStrategy())
 except:
     print ("ERROR 04: bucket {} not found !".format(bucket))
     exit (4)
@@ -105,21 +102,26 @@ if len(response.data) == 0:
 # -- Get current date and time
 now = datetime.datetime.now(datetime.timezone.utc)
 
+# -- Sort requests in active and expired lists in a single pass
+active_pars  = []
+expired_pars = []
+for auth in response.data:
+    (active_pars if auth.time_expires > now else expired_pars).append(auth)
+active_pars.sort(key=lambda auth: auth.time_expires)
+
 # -- List active requests
 print (COLOR_TITLE + "List of ACTIVE pre-authenticated requests for bucket ",end='')
 print (COLOR_BUCKET + bucket + COLOR_TITLE + ": (name, object-name, time-expires)" + COLOR_ACTIVE)
-for auth in response.data:
-    if auth.time_expires > now:
-        print ('- {:50s} {:55s} {}'.format(auth.name, auth.object_name, auth.time_expires))
+for auth in active_pars:
+    print ('- {:50s} {:55s} {}'.format(auth.name, auth.object_name, auth.time_expires))
 
 print ("")
 
 # -- List expired requests
 print (COLOR_TITLE + "List of EXPIRED pre-authenticated requests for bucket ",end='')
 print (COLOR_BUCKET + bucket + COLOR_TITLE + ": (name, object-name, time-expires)" + COLOR_EXPIRED)
-for auth in response.data:
-    if auth.time_expires <= now:
-        print ('- {:50s} {:55s} {}'.format(auth.name, auth.object_name, auth.time_expires))
+for auth in expired_pars:
+    print ('- {:50s} {:55s} {}'.format(auth.name, auth.object_name, auth.time_expires))
 
 print (COLOR_NORMAL)
 
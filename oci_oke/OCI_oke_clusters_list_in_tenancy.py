@@ -22,6 +22,7 @@
 import oci
 import sys
 import argparse
+from functools import lru_cache
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
@@ -46,31 +47,27 @@ def usage():
     exit (1)
 
 # ---- Get the complete name of a compartment from its id, including parent and grand-parent..
+@lru_cache(maxsize=None)
 def get_cpt_name_from_id(cpt_id):
     if cpt_id == RootCompartmentID:
         return "root"
 
-    name=""
-    for c in compartments:
-        if (c.id == cpt_id):
-            name=c.name
-
-            # if the cpt is a direct child of root compartment, return name
-            if c.compartment_id == RootCompartmentID:
-                return name
-            # otherwise, find name of parent and add it as a prefix to name
-            else:
-                name = get_cpt_name_from_id(c.compartment_id)+":"+name
-                return name
+    # walk up the compartments tree until root compartment
+    names = []
+    while cpt_id != RootCompartmentID:
+        c = cpt_by_id.get(cpt_id)
+        if c is None:
+            break
+        names.append(c.name)
+        cpt_id = c.compartment_id
+    return ":".join(reversed(names))
 
 # ---- Look for OKE clusters in the given compartment ID
-def process_compartment (lcpt_id):
+def process_compartment (lcpt_id, region):
     global clusters_ids
 
-    region  = config["region"]
-
     # look for OKE clusters
-    ContainerEngineClient = oci.container_engine.ContainerEngineClient(config)
+    ContainerEngineClient = ce_clients[region]
     response = oci.pagination.list_call_get_all_results(ContainerEngineClient.list_clusters,compartment_id=lcpt_id)
     if len(response.data) > 0:
         for cluster in response.data:
@@ -103,6 +100,7 @@ IdentityClient = oci.identity.IdentityClient(config)
 RootCompartmentID = config['tenancy']
 response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments, RootCompartmentID,compartment_id_in_subtree=True)
 compartments = response.data
+cpt_by_id    = { c.id: c for c in compartments }
 
 # -- get list of subscribed regions
 response = oci.pagination.list_call_get_all_results(IdentityClient.list_region_subscriptions, RootCompartmentID)
@@ -114,22 +112,28 @@ clusters_ids = []
 # -- Query (see https://docs.cloud.oracle.com/en-us/iaas/Content/Search/Concepts/querysyntax.htm)
 query = "query instance resources where displayName =~ 'oke'"
 
+# -- Regions to process
+if not(all_regions):
+    region_names = [ config["region"] ]
+else:
+    region_names = [ region.region_name for region in regions ]
+
+# -- Build the search and container engine clients once per region
+search_clients = {}
+ce_clients     = {}
+for region_name in region_names:
+    region_config = { **config, "region": region_name }
+    search_clients[region_name] = oci.resource_search.ResourceSearchClient(region_config)
+    ce_clients[region_name]     = oci.container_engine.ContainerEngineClient(region_config)
+
 # -- Run the search query/queries to find all OKE compute instances in the region/regions
 # -- then get details about OKE clusters
-if not(all_regions):
-    SearchClient = oci.resource_search.ResourceSearchClient(config)
+for region_name in region_names:
+    SearchClient = search_clients[region_name]
     response = SearchClient.search_resources(oci.resource_search.models.StructuredSearchDetails(type="Structured", query=query))
     for item in response.data.items:
         cpt_name = get_cpt_name_from_id(item.compartment_id)
-        process_compartment (item.compartment_id)
-else:
-    for region in regions:
-        config["region"]=region.region_name
-        SearchClient = oci.resource_search.ResourceSearchClient(config)
-        response = SearchClient.search_resources(oci.resource_search.models.StructuredSearchDetails(type="Structured", query=query))
-        for item in response.data.items:
-            cpt_name = get_cpt_name_from_id(item.compartment_id)
-            process_compartment (item.compartment_id)
+        process_compartment (item.compartment_id, region_name)
 
 # -- the end
 exit (0)
@@ -12,17 +12,28 @@
 # Versions
 #    2021-12-08: Initial Version
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: resize nodes in parallel
+#    2026-10-16: wait for end of resize operation instead of sleeping 3 minutes
+#    2026-10-16: check result of resize operations and leave nodes cordoned if failed
+#    2026-10-16: add -n/--parallel option (nb of nodes resized at the same time, default 1)
 # --------------------------------------------------------------------------------------------------------------
 
 # -------- import
 import oci
 import sys
-import time
-import os
+import subprocess
+import shutil
+import threading
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # -------- variables
-configfile = "~/.oci/config"    # Define config file to be used.
+configfile           = "~/.oci/config"    # Define config file to be used.
+max_wait_seconds     = 600                # Max time to wait for the resize of a node
+max_interval_seconds = 15                 # Max time between 2 checks of the resize status
+work_request_final_states = [ "SUCCEEDED", "FAILED", "CANCELED" ]
+print_lock           = threading.Lock()
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
 
 # -------- functions
 def usage():
@@ -41,6 +52,64 @@ def usage():
     print ( "region      = eu-frankfurt-1")
     exit (1)
 
+# ---- Print a message without mixing output of different nodes
+def print_node(msg):
+    with print_lock:
+        print (msg, flush=True)
+
+# ---- Run a kubectl command for a node and print its output prefixed with the node name
+def run_kubectl(node, *kubectl_args):
+    result = subprocess.run([kubectl_path, *kubectl_args], capture_output=True, text=True, check=False)
+    output = [ f"  {node.name}: {line}" for line in (result.stdout + result.stderr).splitlines() ]
+    if result.returncode != 0:
+        output.append(f"  {node.name}: WARNING: kubectl {kubectl_args[0]} returned error code {result.returncode}")
+    if len(output) > 0:
+        print_node ("\n".join(output))
+
+# ---- Drain, resize then uncordon a node
+# ---- Returns True if the node was resized, False if the resize failed (node then left cordoned)
+def process_node(node):
+    print_node (f"====== Processing node {node.name} ({node.private_ip})...")
+
+    # put the node in maintenance mode (evacuate PODs)
+    print_node (f"- {node.name}: Draining node with 'kubectl drain' command")
+    run_kubectl(node, "drain", node.private_ip, "--force", "--ignore-daemonsets")
+
+    # resize
+    print_node (f"- {node.name}: Changing shape or shape config for the compute instance")
+    new_shape_config = oci.core.models.UpdateInstanceShapeConfigDetails(ocpus = new_ocpus, memory_in_gbs = new_memory_in_gbs)
+    details  = oci.core.models.UpdateInstanceDetails(shape = new_shape, shape_config = new_shape_config)
+    try:
+        response = ComputeClient.update_instance(node.id, details)
+    except oci.exceptions.ServiceError as err:
+        print_node (f"- {node.name}: ERROR: resize request failed ({err.code}: {err.message}), node left cordoned !")
+        return False
+
+    # wait for the resize to be completed and the instance to be running again
+    print_node (f"- {node.name}: Wait for the resize operation to complete")
+    try:
+        work_request_id = response.headers.get("opc-work-request-id")
+        if work_request_id:
+            r = oci.wait_until(WorkRequestClient, WorkRequestClient.get_work_request(work_request_id),
+                               evaluate_response = lambda r: r.data.status in work_request_final_states,
+                               max_interval_seconds = max_interval_seconds, max_wait_seconds = max_wait_seconds)
+            if r.data.status != "SUCCEEDED":
+                print_node (f"- {node.name}: ERROR: resize operation {r.data.status}, node left cordoned !")
+                return False
+        oci.wait_until(ComputeClient, ComputeClient.get_instance(node.id), 'lifecycle_state', 'RUNNING',
+                       max_interval_seconds = max_interval_seconds, max_wait_seconds = max_wait_seconds)
+    except oci.exceptions.MaximumWaitTimeExceeded:
+        print_node (f"- {node.name}: ERROR: resize operation not completed after {max_wait_seconds} seconds, node left cordoned !")
+        return False
+    except oci.exceptions.ServiceError as err:
+        print_node (f"- {node.name}: ERROR: cannot get status of resize operation ({err.code}: {err.message}), node left cordoned !")
+        return False
+
+    #
+    print_node (f"- {node.name}: Re-enabling node with 'kubectl uncordon' command")
+    run_kubectl(node, "uncordon", node.private_ip)
+    return True
+
 # -------- main
 
 # -- parse arguments
@@ -50,11 +119,20 @@ parser.add_argument("-id", "--oke_node_pool_ocid", help="Node Pool OCID", requir
 parser.add_argument("-s", "--shape", help="New shape for compute instances in node pool", required=True)
 parser.add_argument("-c", "--ocpus", help="Number of OCPUs for new flexible shape")
 parser.add_argument("-m", "--memory_in_gbs", help="Amount of memory (GB) for new flexible shape")
+parser.add_argument("-n", "--parallel", help="Nb of nodes drained and resized at the same time (default 1 = rolling resize). "
+                    "All PODs of those nodes are evicted at once, so keep it well below the nb of nodes in the pool (max 1/3 of the pool is used)",
+                    type=int, default=1)
 args = parser.parse_args()
 
 profile           = args.profile
 oke_node_pool_id  = args.oke_node_pool_ocid
 new_shape         = args.shape
+new_ocpus         = None
+new_memory_in_gbs = None
+
+if args.parallel < 1:
+    print ("ERROR: parallel must be at least 1 !")
+    exit (1)
 
 if args.ocpus:
     try:
@@ -70,6 +148,12 @@ if args.memory_in_gbs:
         print (f"ERROR: memory_in_gbs must be an integer ({err}) !")
         exit (1)
 
+# -- find kubectl binary once
+kubectl_path = shutil.which("kubectl")
+if kubectl_path == None:
+    print ("ERROR: kubectl command not found in PATH !")
+    exit (1)
+
 # -- get info from profile
 try:
     config = oci.config.from_file(configfile, profile)
@@ -77,13 +161,9 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
 # -- Get the list of nodes from OKE node pool ID
-ContainerEngineClient = oci.container_engine.ContainerEngineClient(config)
-response  = ContainerEngineClient.get_node_pool(oke_node_pool_id, retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY)
+ContainerEngineClient = oci.container_engine.ContainerEngineClient(config, retry_strategy=retry_strategy)
+response  = ContainerEngineClient.get_node_pool(oke_node_pool_id)
 node_pool = response.data
 nodes     = node_pool.nodes 
 
@@ -100,35 +180,30 @@ print ("")
 print (f"====== Changing shape configuration in the pool for future additional nodes")
 new_shape_config = oci.container_engine.models.UpdateNodeShapeConfigDetails(ocpus = new_ocpus, memory_in_gbs = new_memory_in_gbs)
 details   = oci.container_engine.models.UpdateNodePoolDetails(node_shape = new_shape, node_shape_config = new_shape_config)
-response  = ContainerEngineClient.update_node_pool(oke_node_pool_id, details, retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY)
+response  = ContainerEngineClient.update_node_pool(oke_node_pool_id, details)
 print ("")
 
 # -- Change the shape OR nb of OCPUs OR memory for those nodes
-ComputeClient = oci.core.ComputeClient(config)
-
-for node in nodes:
-    if node.lifecycle_state == "ACTIVE":
-        print (f"====== Processing node {node.name} ({node.private_ip})...")
-
-        # put the node in maintenance mode (evacuate PODs)
-        print ("- Draining node with 'kubectl drain' command")
-        os.system(f"kubectl drain {node.private_ip} --force --ignore-daemonsets")
-
-        # resize
-        print (f"- Changing shape or shape config for the compute instance")
-        new_shape_config = oci.core.models.UpdateInstanceShapeConfigDetails(ocpus = new_ocpus, memory_in_gbs = new_memory_in_gbs)
-        details  = oci.core.models.UpdateInstanceDetails(shape = new_shape, shape_config = new_shape_config)
-        response = ComputeClient.update_instance(node.id, details, retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY)
-
-        # wait a few minutes for the resize to be completed
-        print (f"  Wait for 3 minutes for the resize operation to complete")
-        time.sleep (180)     
-
-        # 
-        print ("- Re-enabling node with 'kubectl uncordon' command")
-        os.system(f"kubectl uncordon {node.private_ip}")
+# -- (nodes are processed one at a time by default; with --parallel N, up to N nodes, and at most 1/3 of
+# --  the pool, are drained and resized at the same time so that the waits for resize operations overlap)
+ComputeClient = oci.core.ComputeClient(config, retry_strategy=retry_strategy)
+WorkRequestClient = oci.work_requests.WorkRequestClient(config, retry_strategy=retry_strategy)
+
+active_nodes = [ node for node in nodes if node.lifecycle_state == "ACTIVE" ]
+results      = []
+if len(active_nodes) > 0:
+    max_workers = max(1, min(args.parallel, len(active_nodes) // 3))
+    if max_workers < args.parallel:
+        print (f"WARNING: only {max_workers} node(s) resized at the same time (max 1/3 of the {len(active_nodes)} active nodes)")
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        results = list(executor.map(process_node, active_nodes))
+print ("")
 
-        print ("")
+# -- Exit with an error if some nodes could not be resized
+failed_nodes = [ node.name for node, resized in zip(active_nodes, results) if not resized ]
+if len(failed_nodes) > 0:
+    print (f"ERROR: resize failed for node(s) {', '.join(failed_nodes)} (left cordoned) !")
+    exit (3)
 
 # -- Happy end
 exit(0)
\ No newline at end of file
@@ -9,6 +9,7 @@
 # Platforms     : MacOS / Linux
 # prerequisites : - Python 3 with OCI Python SDK installed
 #                 - OCI config file configured with profiles
+#                 - (optional) orjson Python module for faster reading of large backup files
 # Versions
 #    2021-11-19: Initial Version
 #    2022-01-03: use argparse to parse arguments
@@ -20,6 +21,11 @@ import json
 import argparse
 from pathlib import Path
 from operator import itemgetter
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # -------- functions
 def usage():
@@ -44,8 +50,8 @@ if not(my_file.is_file()):
 
 # -- Read detailed configuration from backup file
 try:
-    with open(input_file, 'r') as filein:
-        detector_recipe = json.load(filein)
+    with open(input_file, 'rb') as filein:
+        detector_recipe = json_loads(filein.read())
         print (f"Configuration successfully read from backup file {input_file} !")
 except OSError as err:
     print (f"ERROR: {err.strerror}")
@@ -60,21 +66,11 @@ print (f"Number of effective detector rules : {len(detector_recipe['effective_de
 print ("")
 
 # -- Extract results
-max_len_det  = 0
-max_len_resp = 0
-detector_rules = []
-for detector_rule in detector_recipe['effective_detector_rules']:
-    candidate_responder_rules = []
-    if len(detector_rule['detector_rule_id']) > max_len_det:
-        max_len_det = len(detector_rule['detector_rule_id'])
-    if detector_rule['candidate_responder_rules'] != None:
-        for candidate_responder_rule in detector_rule['candidate_responder_rules']:
-            candidate_responder_rules.append(candidate_responder_rule['id'])
-            if len(candidate_responder_rule['id']) > max_len_resp:
-                max_len_resp = len(candidate_responder_rule['id'])
-    detector_rules.append({
-        "detector_rule_id" : detector_rule['detector_rule_id'],
-        "candidate_responder_rules" : candidate_responder_rules })
+detector_rules = [ { "detector_rule_id" : dr['detector_rule_id'],
+                     "candidate_responder_rules" : [ crr['id'] for crr in (dr['candidate_responder_rules'] or []) ] }
+                   for dr in detector_recipe['effective_detector_rules'] ]
+max_len_det  = max((len(dr['detector_rule_id']) for dr in detector_rules), default=0)
+max_len_resp = max((len(crr) for dr in detector_rules for crr in dr['candidate_responder_rules']), default=0)
 
 # -- Sort results
 detector_rules_sorted = sorted(detector_rules, key=itemgetter('detector_rule_id')) 
@@ -84,12 +80,10 @@ header_detector_rule   = "---- DETECTOR RULE ----"
 header_responder_rules = "---- CANDIDATE RESPONDER RULES ----"
 print (f"{header_detector_rule:{max_len_det}s} : {header_responder_rules}")
 
-for detector_rule in detector_rules_sorted:
-    print (f"{detector_rule['detector_rule_id']:{max_len_det}s} : ",end="")
-    if detector_rule['candidate_responder_rules'] != None:
-        for candidate_responder_rule in detector_rule['candidate_responder_rules']:
-            print (f"{candidate_responder_rule:{max_len_resp}s} ",end="")
-    print ("")
+lines = [ detector_rule['detector_rule_id'].ljust(max_len_det) + " : " +
+          "".join(crr.ljust(max_len_resp) + " " for crr in detector_rule['candidate_responder_rules'])
+          for detector_rule in detector_rules_sorted ]
+sys.stdout.write("\n".join(lines) + "\n")
 
 # -- the end
 exit (0)
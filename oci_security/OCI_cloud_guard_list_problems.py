@@ -11,20 +11,23 @@
 #                 - OCI config file configured with profiles
 # Versions
 #    2022-01-03: Initial Version
+#    2026-10-16: add -a option to look in all subscribed regions (in parallel)
+#    2026-10-16: parse arguments without argparse
 # --------------------------------------------------------------------------------------------------------------
 
 
 # -------- import
 import oci
 import sys
-import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
 
 # -------- functions
 def usage():
-    print (f"Usage: {sys.argv[0]} OCI_PROFILE")
+    print (f"Usage: {sys.argv[0]} [-a] -p OCI_PROFILE")
     print ("")
     print (f"note: OCI_PROFILE must exist in {configfile} file (see example below)")
     print ("")
@@ -36,14 +39,32 @@ def usage():
     print ("region      = eu-frankfurt-1")
     exit (1)
 
+# ---- Get the list of Cloud Guard problems using the Cloud Guard endpoint of a region
+def get_problems_in_region(region_name):
+    CloudGuardClient = oci.cloud_guard.CloudGuardClient({ **config, "region": region_name }, retry_strategy=retry_strategy)
+    try:
+        response = oci.pagination.list_call_get_all_results(CloudGuardClient.list_problems,compartment_id=RootCompartmentID)
+        return region_name, response.data
+    except oci.exceptions.ServiceError as err:
+        print (f"WARNING: cannot get Cloud Guard problems in region {region_name} ({err.code})")
+        return region_name, []
+
 # -------- main
 
-# -- parse arguments
-parser = argparse.ArgumentParser(description = "List Cloud Guard problems in an OCI tenant")
-parser.add_argument("-p", "--profile", help="OCI profile", required=True)
-args = parser.parse_args()
-    
-profile = args.profile
+# -- parse arguments (no argparse here to keep startup time short)
+profile     = None
+all_regions = False
+args = sys.argv[1:]
+while len(args) > 0:
+    arg = args.pop(0)
+    if arg in ("-p", "--profile") and len(args) > 0:
+        profile = args.pop(0)
+    elif arg in ("-a", "--all_regions"):
+        all_regions = True
+    else:
+        usage()
+if profile == None:
+    usage()
 
 # -- get info from profile    
 try:
@@ -52,7 +73,7 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
+IdentityClient = oci.identity.IdentityClient(config, retry_strategy=retry_strategy)
 user = IdentityClient.get_user(config["user"]).data
 RootCompartmentID = user.compartment_id
 
@@ -60,12 +81,21 @@ RootCompartmentID = user.compartment_id
 # response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,RootCompartmentID,compartment_id_in_subtree=True)
 # compartments = response.data
 
-# -- Get the list of Cloud Guard problems ids
-CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
-response = oci.pagination.list_call_get_all_results(CloudGuardClient.list_problems,compartment_id=RootCompartmentID)
-if len(response.data) > 0:
-    for pb in response.data:
-        print (f"{pb.region:15s} {pb.id} {pb.resource_id}")
+# -- Get the list of regions to look in
+if not(all_regions):
+    region_names = [ config["region"] ]
+else:
+    response = IdentityClient.list_region_subscriptions(RootCompartmentID)
+    region_names = [ region.region_name for region in response.data ]
+
+# -- Get the list of Cloud Guard problems ids (regions are queried in parallel)
+problems_ids = set()
+with ThreadPoolExecutor(max_workers = len(region_names)) as executor:
+    for region_name, problems in executor.map(get_problems_in_region, region_names):
+        for pb in problems:
+            if pb.id not in problems_ids:
+                problems_ids.add(pb.id)
+                print (f"{pb.region:15s} {pb.id} {pb.resource_id}")
 
 # -- the end
 exit (0)
@@ -22,6 +22,7 @@ import argparse
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
 
 # -------- functions
 def usage():
@@ -42,10 +43,7 @@ def get_cpt_parent(cpt):
     if (cpt.id == RootCompartmentID):
         return "root"
     else:
-        for c in compartments:
-            if c.id == cpt.compartment_id:
-                break
-        return (c)
+        return cpt_by_id.get(cpt.compartment_id)
 
 def cpt_full_name(cpt):
     if cpt.id == RootCompartmentID:
@@ -56,15 +54,17 @@ def cpt_full_name(cpt):
             return cpt.name
         else:
             parent_cpt = get_cpt_parent(cpt)
+            if parent_cpt is None:
+                return cpt.name
             return cpt_full_name(parent_cpt)+":"+cpt.name
 
 def get_cpt_full_name_from_id(cpt_id):
     if cpt_id == RootCompartmentID:
         return "root"
     else:
-        for c in compartments:
-            if (c.id == cpt_id):
-                return cpt_full_name(c)
+        c = cpt_by_id.get(cpt_id)
+        if c is not None:
+            return cpt_full_name(c)
     return
 
 # -------- main
@@ -83,16 +83,17 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
+IdentityClient = oci.identity.IdentityClient(config, retry_strategy=retry_strategy)
 user = IdentityClient.get_user(config["user"]).data
 RootCompartmentID = user.compartment_id
 
 # -- get list of compartments with all sub-compartments
 response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,RootCompartmentID,compartment_id_in_subtree=True)
 compartments = response.data
+cpt_by_id    = { c.id: c for c in compartments }
 
 # -- Oracle managed recipes: get the list of Cloud Guard responder recipes in root compartment
-CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
+CloudGuardClient = oci.cloud_guard.CloudGuardClient(config, retry_strategy=retry_strategy)
 response = oci.pagination.list_call_get_all_results(CloudGuardClient.list_responder_recipes,compartment_id=RootCompartmentID)
 if len(response.data) > 0:
     for recipe in response.data:
@@ -104,7 +105,7 @@ if len(response.data) > 0:
             print (f"compartment : root")
 
 # -- User Managed recipes: search Cloud Guard responder recipes in all compartments
-SearchClient = oci.resource_search.ResourceSearchClient(config)
+SearchClient = oci.resource_search.ResourceSearchClient(config, retry_strategy=retry_strategy)
 
 query = "query cloudguardresponderrecipe resources"
 response = SearchClient.search_resources(oci.resource_search.models.StructuredSearchDetails(type="Structured", query=query))
@@ -23,6 +23,8 @@ from operator import itemgetter
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
+risk_levels_order = { "CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3, "MINOR": 4 }
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
 
 # -------- functions
 def usage():
@@ -38,38 +40,19 @@ def usage():
     print ("region      = eu-frankfurt-1")
     exit (1)
 
-def display_rule(r):
-    print (f"{r['id']:{width_id}s} {r['risk_level']:^10s} {r['is_enabled']:6s}")
-  
-def display_rules_sorted_by_id(rules):
-    for r in rules:
-        display_rule(r)
-
-def display_rules_sorted_by_risk_level(rules):
-    # display CRITICAL detector rules first
-    for r in rules:
-        if r['risk_level'] == "CRITICAL":
-            display_rule(r)
-        
-    # then HIGH detector rules
-    for r in rules:
-        if r['risk_level'] == "HIGH":
-            display_rule(r)
-
-    # then MEDIUM detector rules
-    for r in rules:
-        if r['risk_level'] == "MEDIUM":
-            display_rule(r)
-
-    # then LOW detector rules
-    for r in rules:
-        if r['risk_level'] == "LOW":
-            display_rule(r)
-
-    # and finally MINOR detector rules
-    for r in rules:
-        if r['risk_level'] == "MINOR":
-            display_rule(r)
+def format_rule(r, width_id):
+    return f"{r['id'].ljust(width_id)} {r['risk_level'].center(10)} {r['is_enabled'].ljust(6)}"
+
+def display_rules(rules, width_id):
+    lines = [ format_rule(r, width_id) for r in rules ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def display_rules_sorted_by_id(rules, width_id):
+    display_rules(rules, width_id)
+
+def display_rules_sorted_by_risk_level(rules, width_id):
+    # display CRITICAL detector rules first, then HIGH, MEDIUM, LOW and finally MINOR (sorted by ID for each risk level)
+    display_rules(sorted(rules, key=lambda r: (risk_levels_order.get(r['risk_level'], len(risk_levels_order)), r['id'])), width_id)
 
 # -------- main
 
@@ -89,29 +72,21 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
+IdentityClient = oci.identity.IdentityClient(config, retry_strategy=retry_strategy)
 user = IdentityClient.get_user(config["user"]).data
 RootCompartmentID = user.compartment_id
 
 # -- Get the list of Cloud Guard detector rules in a detector recipe
-CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
-response = oci.pagination.list_call_get_all_results(
-    CloudGuardClient.list_detector_recipe_detector_rules, detector_recipe_id=recipe_ocid, compartment_id=RootCompartmentID)
+CloudGuardClient = oci.cloud_guard.CloudGuardClient(config, retry_strategy=retry_strategy)
+rules_iter = oci.pagination.list_call_get_all_results_generator(
+    CloudGuardClient.list_detector_recipe_detector_rules, 'record', detector_recipe_id=recipe_ocid, compartment_id=RootCompartmentID)
+rules = [ { 'id': rule.id, 'risk_level': rule.detector_details.risk_level, 'is_enabled': str(rule.detector_details.is_enabled) } for rule in rules_iter ]
 
-print (f"Number of detector rules in this detector recipe: {len(response.data)}")
+print (f"Number of detector rules in this detector recipe: {len(rules)}")
 print ("")
 
-if len(response.data) > 0:
-    width_id = 0
-    rules = []
-    for rule in response.data:
-        if len(rule.id) > width_id:
-            width_id = len(rule.id)
-        new_rule = {}
-        new_rule['id']         = rule.id
-        new_rule['risk_level'] = rule.detector_details.risk_level
-        new_rule['is_enabled'] = str(rule.detector_details.is_enabled)
-        rules.append(new_rule)
+if len(rules) > 0:
+    width_id = max(len(r['id']) for r in rules)
 
     header_id = "---- DETECTOR RULE ID ----"
     header_rl = "RISK-LEVEL"
@@ -122,8 +97,8 @@ if len(response.data) > 0:
     sorted_rules = sorted(rules, key=itemgetter('id'))
 
     # -- list rules sorted by ID or RISK_LEVEL then ID
-    display_rules_sorted_by_risk_level(sorted_rules)
-    #display_rules_sorted_by_id(sorted_rules)
+    display_rules_sorted_by_risk_level(sorted_rules, width_id)
+    #display_rules_sorted_by_id(sorted_rules, width_id)
 
 # -- the end
 exit (0)
@@ -23,6 +23,7 @@ from operator import itemgetter
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
 
 # -------- functions
 def usage():
@@ -38,11 +39,11 @@ def usage():
     print ("region      = eu-frankfurt-1")
     exit (1)
 
-def display_rules_sorted_by_id(rules):
-    for r in rules:
-        print (f"{r['id']:{width_id}s} {r['mode']:^10s} {r['is_enabled']:6s}")
-        # CSV
-        #print (f"{r['id']},{r['mode']},{r['is_enabled']}")
+def display_rules_sorted_by_id(rules, width_id):
+    lines = [ f"{r['id'].ljust(width_id)} {r['mode'].center(10)} {r['is_enabled'].ljust(6)}" for r in rules ]
+    # CSV
+    #lines = [ f"{r['id']},{r['mode']},{r['is_enabled']}" for r in rules ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 # -------- main
 
@@ -62,31 +63,21 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
+IdentityClient = oci.identity.IdentityClient(config, retry_strategy=retry_strategy)
 user = IdentityClient.get_user(config["user"]).data
 RootCompartmentID = user.compartment_id
 
 # -- Get the list of Cloud Guard rules in a responder recipe
-CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
-response = oci.pagination.list_call_get_all_results(
-    CloudGuardClient.list_responder_recipe_responder_rules, responder_recipe_id=recipe_ocid, compartment_id=RootCompartmentID)
+CloudGuardClient = oci.cloud_guard.CloudGuardClient(config, retry_strategy=retry_strategy)
+rules_iter = oci.pagination.list_call_get_all_results_generator(
+    CloudGuardClient.list_responder_recipe_responder_rules, 'record', responder_recipe_id=recipe_ocid, compartment_id=RootCompartmentID)
+rules = [ { 'id': rule.id, 'mode': rule.details.mode, 'is_enabled': str(rule.details.is_enabled) } for rule in rules_iter ]
 
-print (f"Number of responder rules in this responder recipe: {len(response.data)}")
+print (f"Number of responder rules in this responder recipe: {len(rules)}")
 print ("")
 
-if len(response.data) > 0:
-    width_id = 0
-    rules = []
-    #print(response.data[0])
-
-    for rule in response.data:
-        if len(rule.id) > width_id:
-            width_id = len(rule.id)
-        new_rule = {}
-        new_rule['id']         = rule.id
-        new_rule['mode']       = rule.details.mode
-        new_rule['is_enabled'] = str(rule.details.is_enabled)
-        rules.append(new_rule)
+if len(rules) > 0:
+    width_id = max(len(r['id']) for r in rules)
 
     header_id     = "RESPONDER RULE ID"
     header_mode   = "MODE"
@@ -96,7 +87,7 @@ if len(response.data) > 0:
     #print (f"{header_id},{header_mode},{header_status}")
 
     sorted_rules = sorted(rules, key=itemgetter('id'))
-    display_rules_sorted_by_id(sorted_rules)
+    display_rules_sorted_by_id(sorted_rules, width_id)
 
 # -- the end
 exit (0)
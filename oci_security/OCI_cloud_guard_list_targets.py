@@ -11,6 +11,7 @@
 # Versions
 #    2021-11-18: Initial Version 
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: cache the list of compartments in ~/.oci/cache for 24 hours (-rc option to refresh it)
 # --------------------------------------------------------------------------------------------------------------
 
 
@@ -18,13 +19,24 @@
 import oci
 import sys
 import argparse
+import json
+import os
+import time
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
+max_workers = 16                # Max number of parallel API requests
+cache_ttl   = 86400             # Validity (in seconds) of the compartments cache file
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
 
 # -------- functions
 def usage():
-    print (f"Usage: {sys.argv[0]} -p OCI_PROFILE")
+    print (f"Usage: {sys.argv[0]} [-rc] -p OCI_PROFILE")
     print ("")
     print (f"note: OCI_PROFILE must exist in {configfile} file (see example below)")
     print ("")
@@ -37,40 +49,69 @@ def usage():
     exit (1)
 
 # ---- Get the full name of compartment from its id
-def get_cpt_parent(cpt):
-    if (cpt.id == RootCompartmentID):
-        return "root"
-    else:
-        for c in compartments:
-            if c.id == cpt.compartment_id:
-                break
-        return (c)
-
-def cpt_full_name(cpt):
-    if cpt.id == RootCompartmentID:
-        return ""
-    else:
-        # if direct child of root compartment
-        if cpt.compartment_id == RootCompartmentID:
-            return cpt.name
-        else:
-            parent_cpt = get_cpt_parent(cpt)
-            return cpt_full_name(parent_cpt)+":"+cpt.name
-
+# ---- (cached: each compartment is visited only once, even when looking up many compartments in the same branch)
+@lru_cache(maxsize=None)
 def get_cpt_full_name_from_id(cpt_id):
     if cpt_id == RootCompartmentID:
         return "root"
+    c = cpt_by_id.get(cpt_id)
+    if c is None:
+        return "?"
+    if c.compartment_id == RootCompartmentID:
+        return c.name
+    return get_cpt_full_name_from_id(c.compartment_id) + ":" + c.name
+
+# ---- Get the details of a target (only needed for targets with recipes, summary is enough for others)
+def get_target(target_summary):
+    if target_summary.recipe_count > 0:
+        return CloudGuardClient.get_target(target_id=target_summary.id).data
     else:
-        for c in compartments:
-            if (c.id == cpt_id):
-                return cpt_full_name(c)
-    return
+        return target_summary
+
+# ---- Get the list of compartments with all sub-compartments
+# ---- (kept in a local cache file for cache_ttl seconds to avoid listing compartments on each run)
+# ---- (1 cache file per tenancy and profile, as visible compartments depend on the IAM policies of the user)
+def load_compartments(tenancy_id, profile, refresh_cache=False):
+    cache_file = Path.home() / ".oci" / "cache" / f"compartments_{tenancy_id}_{profile}.json"
+
+    if not(refresh_cache) and cache_file.exists() and time.time() - cache_file.stat().st_mtime < cache_ttl:
+        try:
+            with open(cache_file, 'r') as filein:
+                return [ SimpleNamespace(**c) for c in json.load(filein) ]
+        except (OSError, ValueError):
+            pass
+
+    response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,tenancy_id,compartment_id_in_subtree=True)
+    cpts = [ { "id": c.id, "name": c.name, "compartment_id": c.compartment_id } for c in response.data ]
+
+    # write the cache file atomically (unique temporary file then rename, so that concurrent runs do not mix files)
+    tmp_file = None
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=cache_file.parent, suffix=".tmp", delete=False) as fileout:
+            tmp_file = fileout.name
+            json.dump(cpts, fileout)
+        os.replace(tmp_file, cache_file)
+    except OSError as err:
+        print (f"WARNING: cannot write compartments cache file {cache_file} ({err})")
+        if tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    return [ SimpleNamespace(**c) for c in cpts ]
+
+# ---- Increase the size of the HTTPS connections pool of an OCI client so that parallel requests reuse connections
+# ---- (the default pool only keeps 10 connections, so extra connections would be re-opened for each request)
+def set_connection_pool_size(client, pool_size):
+    session = client.base_client.session
+    adapter = session.get_adapter("https://")
+    session.mount("https://", type(adapter)(pool_connections=pool_size, pool_maxsize=pool_size))
 
 # -------- main
 
 # -- parse arguments
 parser = argparse.ArgumentParser(description = "List Cloud Guard problems in an OCI tenant")
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
+parser.add_argument("-rc", "--refresh_cache", help="Refresh the compartments cache file", action="store_true")
 args = parser.parse_args()
     
 profile = args.profile
@@ -82,36 +123,39 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
+IdentityClient = oci.identity.IdentityClient(config, retry_strategy=retry_strategy)
 user = IdentityClient.get_user(config["user"]).data
 RootCompartmentID = user.compartment_id
 
 # -- get list of compartments with all sub-compartments
-response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,RootCompartmentID,compartment_id_in_subtree=True)
-compartments = response.data
-
-# -- Search Cloud Guard targets in all compartments
-CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
-SearchClient     = oci.resource_search.ResourceSearchClient(config)
-
-query = "query cloudguardtarget resources"
-response = SearchClient.search_resources(oci.resource_search.models.StructuredSearchDetails(type="Structured", query=query))
-print (f"Number of Cloud Guard targets : {len(response.data.items)}")
-for item in response.data.items:
-    response2 = CloudGuardClient.get_target(target_id=item.identifier) 
-    target    = response2.data  
+compartments = load_compartments(RootCompartmentID, profile, args.refresh_cache)
+cpt_by_id    = { c.id: c for c in compartments }
+
+# -- List Cloud Guard targets in all compartments
+CloudGuardClient = oci.cloud_guard.CloudGuardClient(config, retry_strategy=retry_strategy)
+set_connection_pool_size(CloudGuardClient, max_workers)
+response = oci.pagination.list_call_get_all_results(CloudGuardClient.list_targets, compartment_id=RootCompartmentID,
+                                                    compartment_id_in_subtree=True, access_level="ACCESSIBLE")
+targets_summaries = response.data
+print (f"Number of Cloud Guard targets : {len(targets_summaries)}")
+
+# get details of targets with recipes with parallel requests
+with ThreadPoolExecutor(max_workers = max_workers) as executor:
+    targets = list(executor.map(get_target, targets_summaries))
+
+for target in targets:
     print ("---------- ")
     print (f"target name          : {target.display_name}")
     print (f"target ocid          : {target.id}")
     print (f"target resource id   : {target.target_resource_id}")
     print (f"target resource name : {get_cpt_full_name_from_id(target.target_resource_id)}")
-    print (f"compartment          : {get_cpt_full_name_from_id(item.compartment_id)}")
+    print (f"compartment          : {get_cpt_full_name_from_id(target.compartment_id)}")
     print (f"recipe count         : {target.recipe_count}")
     
+    # recipes details only available for targets with recipes (others are target summaries)
     if target.recipe_count > 0:
         print("")
 
-    if len(target.target_detector_recipes) > 0:
         for detector_recipe in target.target_detector_recipes:
             print (f"detector recipe {detector_recipe.detector}")
             print (f"- name                                 : {detector_recipe.display_name}")
@@ -119,7 +163,6 @@ for item in response.data.items:
             print (f"- parent recipe ocid (in recipes list) : {detector_recipe.detector_recipe_id}")
             print ("")
 
-    if len(target.target_responder_recipes) > 0:
         for responder_recipe in target.target_responder_recipes:
             print (f"responder recipe")
             print (f"- name                                 : {responder_recipe.display_name}")
@@ -13,6 +13,7 @@
 # Platforms     : MacOS / Linux
 # prerequisites : - Python 3 with OCI Python SDK installed
 #                 - OCI config file configured with profiles
+#                 - (optional) orjson Python module for faster writing of large backup files
 # Versions
 #    2021-11-16: Initial Version
 #    2021-11-19: Remove responder_rules[] from backup and use effective_responder_rules[]
@@ -22,27 +23,41 @@
 
 # -------- import
 import oci
-import sys
+import os
+import json
 import argparse
 from pathlib import Path
-from operator import itemgetter
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
 
 # -------- functions
-def usage():
-    print (f"Usage: {sys.argv[0]} OCI_PROFILE responder_recipe_ocid output_file.json")
-    print ("")
-    print (f"note: OCI_PROFILE must exist in {configfile} file (see example below)")
-    print ("")
-    print ("[EMEAOSC]")
-    print ("tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx")
-    print ("key_file    = /Users/cpauliat/.oci/api_key.pem")
-    print ("region      = eu-frankfurt-1")
-    exit (1)
+# ---- Serialize data to JSON followed by a newline (same format as OCI SDK models: indent=2, sorted keys), using orjson if available
+def to_json_bytes(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    else:
+        return (json.dumps(data, indent=2, sort_keys=True) + "\n").encode()
+
+# ---- Write data to a new file, usually in a single system call (fails if the file already exists)
+# ---- (os.write may write only part of the data, so loop until all bytes are written)
+# ---- If the write fails, the incomplete file is removed so that it cannot be used as a backup
+def write_new_file(filename, data):
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+    except BaseException:
+        os.remove(filename)
+        raise
 
 # -------- main
 
@@ -70,9 +85,6 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
 CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
 
 # -- Get the detailed responder recipe including rules
@@ -83,19 +95,22 @@ except oci.exceptions.ServiceError as err:
     exit (4)    
 
 # -- No need to save responder_rules (reduce size of backup file)
-response.data.responder_rules = []
+recipe = oci.util.to_dict(response.data)
+recipe['responder_rules'] = []
 
 # -- Display main characteristics of the responder recipe
-print (f"Responder recipe name               : {response.data.display_name}")
-print (f"Responder recipe owner              : {response.data.owner}")
-print (f"Number of effective responder rules : {len(response.data.effective_responder_rules)}")
+print (f"Responder recipe name               : {recipe['display_name']}")
+print (f"Responder recipe owner              : {recipe['owner']}")
+print (f"Number of effective responder rules : {len(recipe['effective_responder_rules'])}")
 print ("")
 
 # -- Save this detailed configuration (JSON formatted) in the output file
 try:
-    with open(output_file, 'w') as fileout:
-        print (response.data, file=fileout)
-        print (f"Responder recipe configuration successfully saved to JSON file {output_file} !")
+    write_new_file(output_file, to_json_bytes(recipe))
+    print (f"Responder recipe configuration successfully saved to JSON file {output_file} !")
+except FileExistsError:
+    print (f"ERROR: a file or directory already exists with name {output_file} !")
+    exit (3)
 except OSError as err:
     print (f"ERROR: {err.strerror}")
 
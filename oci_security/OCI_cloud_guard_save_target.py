@@ -20,73 +20,94 @@
 # Platforms     : MacOS / Linux
 # prerequisites : - Python 3 with OCI Python SDK installed
 #                 - OCI config file configured with profiles
+#                 - (optional) orjson Python module for faster writing of large backup files
 # Versions
 #    2021-11-19: Initial Version
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: only list all compartments if --full_cpt_path option is used
 # --------------------------------------------------------------------------------------------------------------
 
 
 # -------- import
 import oci
-import sys
+import os
+import json
 import argparse
 from pathlib import Path
-from operator import itemgetter
+from functools import lru_cache
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
 
 # -------- functions
-def usage():
-    print (f"Usage: {sys.argv[0]} -p OCI_PROFILE -t target_ocid -f output_file.json")
-    print ("")
-    print (f"note: OCI_PROFILE must exist in {configfile} file (see example below)")
-    print ("")
-    print ("[EMEAOSC]")
-    print ("tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx")
-    print ("key_file    = /Users/cpauliat/.oci/api_key.pem")
-    print ("region      = eu-frankfurt-1")
-    exit (1)
+# ---- Build the full names of all compartments with repeated sweeps, one per tree level (a compartment is named once its parent is)
+def build_cpt_full_names(compartments):
+    parent    = { c.id: c.compartment_id for c in compartments }
+    name      = { c.id: c.name for c in compartments }
+    full      = { RootCompartmentID: "root" }
+    remaining = list(parent)
+    while remaining:
+        left = []
+        for cid in remaining:
+            pid = parent[cid]
+            if pid == RootCompartmentID or pid not in parent:
+                full[cid] = name[cid]
+            elif pid in full:
+                full[cid] = full[pid] + ":" + name[cid]
+            else:
+                left.append(cid)
+        remaining = left
+    return full
 
 # ---- Get the full name of compartment from its id
-def get_cpt_parent(cpt):
-    if (cpt.id == RootCompartmentID):
-        return "root"
-    else:
-        for c in compartments:
-            if c.id == cpt.compartment_id:
-                break
-        return (c)
-
-def cpt_full_name(cpt):
-    if cpt.id == RootCompartmentID:
-        return ""
-    else:
-        # if direct child of root compartment
-        if cpt.compartment_id == RootCompartmentID:
-            return cpt.name
-        else:
-            parent_cpt = get_cpt_parent(cpt)
-            return cpt_full_name(parent_cpt)+":"+cpt.name
-
 def get_cpt_full_name_from_id(cpt_id):
+    return cpt_full_names.get(cpt_id)
+
+# ---- Get the name of compartment from its id (single API call, name of parent compartments not included)
+@lru_cache(maxsize=None)
+def get_cpt_name_from_id(cpt_id):
     if cpt_id == RootCompartmentID:
         return "root"
+    try:
+        return IdentityClient.get_compartment(cpt_id).data.name
+    except oci.exceptions.ServiceError:
+        return None
+
+# ---- Serialize data to JSON followed by a newline (same format as OCI SDK models: indent=2, sorted keys), using orjson if available
+def to_json_bytes(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
     else:
-        for c in compartments:
-            if (c.id == cpt_id):
-                return cpt_full_name(c)
-    return
+        return (json.dumps(data, indent=2, sort_keys=True) + "\n").encode()
+
+# ---- Write data to a new file, usually in a single system call (fails if the file already exists)
+# ---- (os.write may write only part of the data, so loop until all bytes are written)
+# ---- If the write fails, the incomplete file is removed so that it cannot be used as a backup
+def write_new_file(filename, data):
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+    except BaseException:
+        os.remove(filename)
+        raise
 
 # -------- main
 
 # -- parse arguments
 parser = argparse.ArgumentParser(description = "Save configuration of a Cloud Guard target")
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
-parser.add_argument("-r", "--target_ocid", help="Target OCID", required=True)
+parser.add_argument("-r", "-t", "--target_ocid", help="Target OCID", required=True)
 parser.add_argument("-f", "--file", help="Backup file (.json)", required=True)
+parser.add_argument("-fp", "--full_cpt_path", help="Display full path of compartments (lists all compartments, slower)", action="store_true")
 args = parser.parse_args()
     
 profile     = args.profile
@@ -107,62 +128,61 @@ except:
     exit (2)
 
 IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
+RootCompartmentID = config["tenancy"]
 
-# -- get list of compartments with all sub-compartments
-response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,RootCompartmentID,compartment_id_in_subtree=True)
-compartments = response.data
+# -- get list of compartments with all sub-compartments (only needed to display full path of compartments)
+if args.full_cpt_path:
+    response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,RootCompartmentID,compartment_id_in_subtree=True,access_level="ACCESSIBLE",lifecycle_state="ACTIVE")
+    cpt_full_names = build_cpt_full_names(response.data)
+    get_cpt_name = get_cpt_full_name_from_id
+else:
+    get_cpt_name = get_cpt_name_from_id
 
 # -- Get the target
 CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
 try:
     response = CloudGuardClient.get_target(target_id=target_ocid)
-    target   = response.data
+    target   = oci.util.to_dict(response.data)
 except oci.exceptions.ServiceError as err:
     print (f"ERROR: {err.message}")
     exit (4) 
     
-# --  Remove detector_rules to reduce backup size (we will use effective_detector_rules)
-for detector_recipe in target.target_detector_recipes:      
-    detector_recipe.detector_rules = []
-
-# --  Remove responder_rules to reduce backup size (we will use effective_responder_rules)
-for responder_recipe in target.target_responder_recipes:      
-    responder_recipe.responder_rules = []
-
 # -- Display main characteristics of the target
-print (f"target name          : {target.display_name}")
-print (f"target ocid          : {target.id}")
-print (f"target resource id   : {target.target_resource_id}")
-print (f"target resource name : {get_cpt_full_name_from_id(target.target_resource_id)}")
-print (f"compartment          : {get_cpt_full_name_from_id(target.compartment_id)}")
-print (f"recipe count         : {target.recipe_count}")
-
-if target.recipe_count > 0:
+print (f"target name          : {target['display_name']}")
+print (f"target ocid          : {target['id']}")
+print (f"target resource id   : {target['target_resource_id']}")
+print (f"target resource name : {get_cpt_name(target['target_resource_id'])}")
+print (f"compartment          : {get_cpt_name(target['compartment_id'])}")
+print (f"recipe count         : {target['recipe_count']}")
+
+if target['recipe_count'] > 0:
     print("")
 
-if len(target.target_detector_recipes) > 0:
-    for detector_recipe in target.target_detector_recipes:
-        print (f"detector recipe {detector_recipe.detector}")
-        print (f"- name                                 : {detector_recipe.display_name}")
-        print (f"- child recipe ocid (in target)        : {detector_recipe.id}")
-        print (f"- parent recipe ocid (in recipes list) : {detector_recipe.detector_recipe_id}")
-        print ("")
-
-if len(target.target_responder_recipes) > 0:
-    for responder_recipe in target.target_responder_recipes:
-        print (f"responder recipe")
-        print (f"- name                                 : {responder_recipe.display_name}")
-        print (f"- child recipe ocid (in target)        : {responder_recipe.id}")
-        print (f"- parent recipe ocid (in recipes list) : {responder_recipe.responder_recipe_id}")
-        print ("")    
+# -- Display recipes and remove detector_rules to reduce backup size (we will use effective_detector_rules)
+for detector_recipe in target['target_detector_recipes']:
+    detector_recipe['detector_rules'] = []
+    print (f"detector recipe {detector_recipe['detector']}")
+    print (f"- name                                 : {detector_recipe['display_name']}")
+    print (f"- child recipe ocid (in target)        : {detector_recipe['id']}")
+    print (f"- parent recipe ocid (in recipes list) : {detector_recipe['detector_recipe_id']}")
+    print ("")
+
+# -- Display recipes and remove responder_rules to reduce backup size (we will use effective_responder_rules)
+for responder_recipe in target['target_responder_recipes']:
+    responder_recipe['responder_rules'] = []
+    print (f"responder recipe")
+    print (f"- name                                 : {responder_recipe['display_name']}")
+    print (f"- child recipe ocid (in target)        : {responder_recipe['id']}")
+    print (f"- parent recipe ocid (in recipes list) : {responder_recipe['responder_recipe_id']}")
+    print ("")    
 
 # -- Save this detailed configuration (JSON formatted) in the output file
 try:
-    with open(output_file, 'w') as fileout:
-        print (target, file=fileout)
-        print (f"Target configuration successfully saved to JSON file {output_file} !")
+    write_new_file(output_file, to_json_bytes(target))
+    print (f"Target configuration successfully saved to JSON file {output_file} !")
+except FileExistsError:
+    print (f"ERROR: a file or directory already exists with name {output_file} !")
+    exit (3)
 except OSError as err:
     print (f"ERROR: {err.strerror}")
 
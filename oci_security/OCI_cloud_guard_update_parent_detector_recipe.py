@@ -22,204 +22,179 @@
 # Platforms     : MacOS / Linux
 # prerequisites : - Python 3 with OCI Python SDK installed
 #                 - OCI config file configured with profiles
+#                 - (optional) orjson Python module for faster reading of large backup files
 # Versions
 #    2021-11-16: Initial Version
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: add --yes option to update without confirmation
 # --------------------------------------------------------------------------------------------------------------
 
 # -------- import
 import oci
-import sys
-import json
 import argparse
 from pathlib import Path
+from oci.cloud_guard.models import DetectorConfiguration, SimpleCondition, CompositeCondition
+from oci.cloud_guard.models import UpdateDetectorRuleDetails, UpdateDetectorRecipeDetectorRule, UpdateDetectorRecipeDetails
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
-different  = False              # Is configuration in backup file different from current configuration
+recipe_fields = [ "display_name", "description", "defined_tags", "freeform_tags" ]   # compared recipe fields
+rule_fields   = [ "is_enabled", "risk_level" ]                                       # compared rule details fields
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for the update request (throttling and server errors)
+
+# -- notes displayed after the arguments help (argparse -h)
+help_epilog = f"""notes:
+- The OCID of the detector recipe to update is stored in the backup file
+- OCI_PROFILE must exist in {configfile} file (see example below)
+
+[EMEAOSC]
+tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx
+key_file    = /Users/cpauliat/.oci/api_key.pem
+region      = eu-frankfurt-1"""
 
 # -------- functions
-def usage():
-    print (f"Usage: {sys.argv[0]} -p OCI_PROFILE -f input_backup_file.json")
-    print ("")
-    print ("notes: ")
-    print ("- The OCID of the detector recipe to update is stored in the backup file")
-    print (f"- OCI_PROFILE must exist in {configfile} file (see example below)")
-    print ("")
-    print ("[EMEAOSC]")
-    print ("tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx")
-    print ("key_file    = /Users/cpauliat/.oci/api_key.pem")
-    print ("region      = eu-frankfurt-1")
-    exit (1)
+# -- Parse JSON content, using orjson if available
+def from_json_bytes(data):
+    if orjson:
+        return orjson.loads(data)
+    else:
+        return json.loads(data)
 
 # -- Build class oci.cloud_guard.models.UpdateDetectorRecipeDetails from JSON content read in file
-def build_update_detector_recipe_class():
+# -- (only the detector rules whose configuration is different are included, no rules list if none is different)
+def build_update_detector_recipe_class(changed_rule_ids):
     rules = []
     for rule in detector_recipe['effective_detector_rules']:
+        if rule['detector_rule_id'] not in changed_rule_ids:
+            continue
+        details = rule['details']
+
         # configurations
-        if rule['details']['configurations'] == None:
+        if details['configurations'] == None:
             my_configurations = None
         else:
-            my_configurations = []
-            for c in rule['details']['configurations']:
-                my_configurations.append(oci.cloud_guard.models.DetectorConfiguration(
+            my_configurations = [ DetectorConfiguration(
                     config_key = c['config_key'],
                     data_type  = c['data_type'],
                     name       = c['name'],
                     value      = c['value'],
-                    values     = c['values']               
-                ))
+                    values     = c['values']
+                ) for c in details['configurations'] ]
 
         # conditional groups
-        if rule['details']['condition'] == None:
+        condition = details['condition']
+        if condition == None:
             my_condition = None
         else:
-            if rule['details']['condition']['kind'] == "SIMPLE":
-                my_condition = oci.cloud_guard.models.SimpleCondition(
+            if condition['kind'] == "SIMPLE":
+                my_condition = SimpleCondition(
                     kind = "SIMPLE",
-                    operator = rule['details']['condition']['operator'],
-                    parameter = rule['details']['condition']['parameter'],
-                    value = rule['details']['condition']['value'],
-                    value_type = rule['details']['condition']['value_type']
+                    operator = condition['operator'],
+                    parameter = condition['parameter'],
+                    value = condition['value'],
+                    value_type = condition['value_type']
                 )
             else:
                 # TO TEST
-                my_condition = oci.cloud_guard.models.CompositeCondition(
-                    kind = rule['details']['condition']['kind'],
-                    composite_operator = rule['details']['condition']['composite_operator'],   
-                    left_operand = rule['details']['condition']['left_operand'],   
-                    right_operand = rule['details']['condition']['right_operand']
+                my_condition = CompositeCondition(
+                    kind = condition['kind'],
+                    composite_operator = condition['composite_operator'],   
+                    left_operand = condition['left_operand'],   
+                    right_operand = condition['right_operand']
                 )
 
         # 
-        new_rule_details = oci.cloud_guard.models.UpdateDetectorRuleDetails(
-            risk_level = rule['details']['risk_level'], 
-            is_enabled = rule['details']['is_enabled'],
+        new_rule_details = UpdateDetectorRuleDetails(
+            risk_level = details['risk_level'], 
+            is_enabled = details['is_enabled'],
             configurations = my_configurations,
             condition = my_condition)
-        new_rule = oci.cloud_guard.models.UpdateDetectorRecipeDetectorRule(
+        rules.append(UpdateDetectorRecipeDetectorRule(
             detector_rule_id = rule['detector_rule_id'], 
-            details = new_rule_details)
-        rules.append(new_rule)
+            details = new_rule_details))
 
-    details = oci.cloud_guard.models.UpdateDetectorRecipeDetails(
+    details = UpdateDetectorRecipeDetails(
         defined_tags   = detector_recipe['defined_tags'], 
         description    = detector_recipe['description'], 
-        detector_rules = rules, 
+        detector_rules = rules or None, 
         display_name   = detector_recipe['display_name'], 
         freeform_tags  = detector_recipe['freeform_tags'])   
     
     return details
 
 # -- Check differences between current configuration and configuration in backup file
+# -- and return the IDs of the detector rules to update
 def check_differences():
-    global different
+    different        = False    # Are recipe display name, description or tags different ?
+    changed_rule_ids = set()    # IDs of detector rules whose configuration is different
 
     print ("DIFFERENCES between current configuration and configuration in file: ", end="")
 
-    # get current configuration of the detector recipe
+    # get current configuration of the detector recipe (converted to dict to be compared with backup)
     response = CloudGuardClient.get_detector_recipe(detector_recipe_id=detector_recipe['id'])
-    current_recipe = response.data
-
-    # check differences in the display_name
-    if detector_recipe['display_name'] != current_recipe.display_name:
-        different = True
-        print ("")
-        print (f"- CURRENT display_name  : {current_recipe.display_name}")
-        print (f"- NEW     display_name  : {detector_recipe['display_name']}")
-
-    # check differences in the description
-    if detector_recipe['description'] != current_recipe.description:
-        different = True
-        print ("")
-        print (f"- CURRENT description   : {current_recipe.description}")
-        print (f"- NEW     description   : {detector_recipe['description']}")
-
-    # check differences in the defined_tags
-    if detector_recipe['defined_tags'] != current_recipe.defined_tags:
-        different = True
-        print ("")
-        print (f"- CURRENT defined_tags  : {current_recipe.defined_tags}")
-        print (f"- NEW     defined_tags  : {detector_recipe['defined_tags']}")
+    current_recipe = oci.util.to_dict(response.data)
 
-    # check differences in the freeform_tags
-    if detector_recipe['freeform_tags'] != current_recipe.freeform_tags:
-        different = True
-        print ("")
-        print (f"- CURRENT freeform_tags : {current_recipe.freeform_tags}")
-        print (f"- NEW     freeform_tags : {detector_recipe['freeform_tags']}")
+    # check differences in the display_name, description, defined_tags and freeform_tags
+    for field in recipe_fields:
+        if detector_recipe[field] != current_recipe[field]:
+            different = True
+            print ("")
+            print (f"- CURRENT {field:<13} : {current_recipe[field]}")
+            print (f"- NEW     {field:<13} : {detector_recipe[field]}")
 
     # check differences in each detector rule
-    for current_rule in current_recipe.effective_detector_rules:
-        rule_found = False
-        for new_rule in detector_recipe['effective_detector_rules']:
-            if new_rule['detector_rule_id'] == current_rule.detector_rule_id:
-                rule_found = True
-                break
+    new_rules_by_id = { r['detector_rule_id']: r for r in detector_recipe['effective_detector_rules'] }
+    for current_rule in current_recipe['effective_detector_rules']:
+        rule_id  = current_rule['detector_rule_id']
+        new_rule = new_rules_by_id.get(rule_id)
             
         # if the current rule ID does not exist in backup, stop the script
-        if not(rule_found):
-            print (f"ERROR: rule id {current_rule.detector_rule_id} not found in backup --> edit backup file, add this rule and re-run the script !")
+        if new_rule is None:
+            print (f"ERROR: rule id {rule_id} not found in backup --> edit backup file, add this rule and re-run the script !")
             exit (5)
+
         # otherwise, check enabled status, risk level, settings and conditional group
-        else:
+        cur_details = current_rule['details']
+        new_details = new_rule['details']
 
-            # comparing status: "details.is_enabled"
-            if current_rule.details.is_enabled != new_rule['details']['is_enabled']:
-                different = True
+        # comparing status (is_enabled) and risk level (risk_level)
+        for field in rule_fields:
+            if cur_details[field] != new_details[field]:
+                changed_rule_ids.add(rule_id)
                 print ("")
-                print (f"- Detector rule id {current_rule.detector_rule_id}")
-                print (f"  - CURRENT is_enabled : {current_rule.details.is_enabled}")
-                print (f"  - NEW     is_enabled : {new_rule['details']['is_enabled']}")
+                print (f"- Detector rule id {rule_id}")
+                print (f"  - CURRENT {field} : {cur_details[field]}")
+                print (f"  - NEW     {field} : {new_details[field]}")
 
-            # comparing risk levels: "details.risk_level"
-            if current_rule.details.risk_level != new_rule['details']['risk_level']:
-                different = True
-                print ("")
-                print (f"- Detector rule id {current_rule.detector_rule_id}")
-                print (f"  - CURRENT risk_level : {current_rule.details.risk_level}")
-                print (f"  - NEW     risk_level : {new_rule['details']['risk_level']}")
-
-            # comparing configurations (settings) if they exists (for config_key and value)
-            try:
-                for new_config in new_rule['details']['configurations']:
-                    for current_config in current_rule.details.configurations:
-                        if current_config.config_key == new_config['config_key']:
-                            break
-                    if current_config.value != new_config['value']:
-                        different = True
-                        print ("")
-                        print (f"- Detector rule id {current_rule.detector_rule_id}")
-                        print (f"  - CURRENT configurations key {current_config.config_key} : {current_config.value}")
-                        print (f"  - NEW     configurations key {current_config.config_key} : {new_config['value']}")                    
-            except:
-                pass
-
-            # comparing condition (conditional group) if it exists
-            #try:
-            if current_rule.details.condition != None:
-                current_condition_dict = {}
-                current_condition_dict['kind']       = current_rule.details.condition.kind
-                current_condition_dict['operator']   = current_rule.details.condition.operator
-                current_condition_dict['parameter']  = current_rule.details.condition.parameter
-                current_condition_dict['value']      = current_rule.details.condition.value
-                current_condition_dict['value_type'] = current_rule.details.condition.value_type
-            else:
-                current_condition_dict = None
+        # comparing configurations (settings): whole list (keys, values, data types...)
+        if cur_details['configurations'] != new_details.get('configurations'):
+            changed_rule_ids.add(rule_id)
+            print ("")
+            print (f"- Detector rule id {rule_id}")
+            print (f"  - CURRENT configurations : {cur_details['configurations']}")
+            print (f"  - NEW     configurations : {new_details.get('configurations')}")
 
-            if current_condition_dict != new_rule['details']['condition']:
-                different = True
-                print ("")    
-                print (f"- Detector rule id {current_rule.detector_rule_id}")
-                print (f"  - CURRENT condition : {current_condition_dict}")
-                print (f"  - NEW     condition : {new_rule['details']['condition']}")
+        # comparing condition (conditional group)
+        if cur_details['condition'] != new_details['condition']:
+            changed_rule_ids.add(rule_id)
+            print ("")
+            print (f"- Detector rule id {rule_id}")
+            print (f"  - CURRENT condition : {cur_details['condition']}")
+            print (f"  - NEW     condition : {new_details['condition']}")
 
     # If differences are found, ask for confirmation before updating configuration
     # If not, simply stops the script
-    if different:
+    if different or changed_rule_ids:
         print ("")
+        if args.yes:
+            return changed_rule_ids
         resp = input("Do you confirm you want to update this detector recipe ? (y/n): ")
         print ("")
         if resp != "y":
@@ -233,12 +208,16 @@ def check_differences():
         print ("")
         exit (0)
 
+    return changed_rule_ids
+
 # -------- main
 
 # -- parse arguments
-parser = argparse.ArgumentParser(description = "Update a Cloud Guard detector recipe from a backup file")
+parser = argparse.ArgumentParser(description = "Update a Cloud Guard detector recipe from a backup file", epilog = help_epilog,
+                                 formatter_class = argparse.RawDescriptionHelpFormatter)
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
 parser.add_argument("-f", "--file", help="input file (.json)", required=True)
+parser.add_argument("-y", "--yes", help="Update without asking for confirmation", action="store_true")
 args = parser.parse_args()
     
 profile    = args.profile
@@ -257,19 +236,14 @@ except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
     exit (2)
 
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
 # -- Read detailed configuration from backup file
 try:
-    with open(input_file, 'r') as filein:
-        detector_recipe = json.load(filein)
-        print (f"Configuration successfully read from backup file {input_file} !")
+    detector_recipe = from_json_bytes(my_file.read_bytes())
+    print (f"Configuration successfully read from backup file {input_file} !")
 except OSError as err:
     print (f"ERROR: {err.strerror}")
     exit (3)
-except json.decoder.JSONDecodeError as err:
+except ValueError as err:
     print (f"ERROR in JSON input file: {err}")
     exit (4)
 
@@ -285,18 +259,18 @@ print ("")
 CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
 
 # -- Display differences between current configuration and configuration in backup file
-# -- Stop script if no difference found, or if difference found but update not confirmed
-check_differences()
+# -- Stop script if no difference found, or if difference found but update not confirmed (unless --yes)
+changed_rule_ids = check_differences()
 
 # -- Build class oci.cloud_guard.models.UpdateDetectorRecipeDetails from JSON content read in file
-details_class = build_update_detector_recipe_class()
+details_class = build_update_detector_recipe_class(changed_rule_ids)
 
 # -- Update detector recipe
 try:
     response = CloudGuardClient.update_detector_recipe(
         detector_recipe_id = detector_recipe['id'], 
         update_detector_recipe_details = details_class,
-        retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY)
+        retry_strategy = retry_strategy)
     print ("Detector recipe configuration successfully restored/updated !")
 except Exception as err:
     print (f"ERROR: {err}")
@@ -18,6 +18,7 @@
 # Platforms     : MacOS / Linux
 # prerequisites : - Python 3 with OCI Python SDK installed
 #                 - OCI config file configured with profiles
+#                 - (optional) orjson Python module for faster reading of large backup files
 # Versions
 #    2021-11-19: Initial Version
 #    2022-01-03: use argparse to parse arguments
@@ -26,40 +27,52 @@
 # -------- import
 import oci
 import sys
-import json
 import argparse
 from pathlib import Path
+from functools import lru_cache
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
 different  = False              # Is configuration in backup file different from current configuration
+recipe_fields = [ "display_name", "description", "defined_tags", "freeform_tags" ]   # compared recipe fields
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for the update request (throttling and server errors)
+
+# -- notes displayed after the arguments help (argparse -h)
+help_epilog = f"""notes:
+- The OCID of the responder recipe to update is stored in the backup file
+- OCI_PROFILE must exist in {configfile} file (see example below)
+
+[EMEAOSC]
+tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx
+key_file    = /Users/cpauliat/.oci/api_key.pem
+region      = eu-frankfurt-1"""
 
 # -------- functions
-def usage():
-    print (f"Usage: {sys.argv[0]} -p OCI_PROFILE -f input_backup_file.json")
-    print ("")
-    print ("notes: ")
-    print ("- The OCID of the responder recipe to update is stored in the backup file")
-    print (f"- OCI_PROFILE must exist in {configfile} file (see example below)")
-    print ("")
-    print ("[EMEAOSC]")
-    print ("tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx")
-    print ("key_file    = /Users/cpauliat/.oci/api_key.pem")
-    print ("region      = eu-frankfurt-1")
-    exit (1)
+# -- Load a profile from an OCI config file (parsed only once for a given file and profile)
+@lru_cache(maxsize=8)
+def load_config(config_file, profile):
+    return oci.config.from_file(config_file, profile)
+
+# -- Parse JSON content, using orjson if available
+def from_json_bytes(data):
+    if orjson:
+        return orjson.loads(data)
+    else:
+        return json.loads(data)
 
 # -- Build class oci.cloud_guard.models.UpdateResponderRecipeDetails from JSON content read in file
 def build_update_responder_recipe_class():
-    rules = []
-    for rule in responder_recipe['effective_responder_rules']:
-        new_rule_details = oci.cloud_guard.models.UpdateResponderRuleDetails(
-            is_enabled = rule['details']['is_enabled'])
-        new_rule = oci.cloud_guard.models.UpdateResponderRecipeResponderRule(
-            responder_rule_id = rule['responder_rule_id'], 
-            details = new_rule_details)
-        rules.append(new_rule)
+    rules = [ oci.cloud_guard.models.UpdateResponderRecipeResponderRule(
+                responder_rule_id = rule['responder_rule_id'], 
+                details = oci.cloud_guard.models.UpdateResponderRuleDetails(is_enabled = rule['details']['is_enabled']))
+              for rule in responder_recipe['effective_responder_rules'] ]
 
     details = oci.cloud_guard.models.UpdateResponderRecipeDetails(
         defined_tags    = responder_recipe['defined_tags'], 
@@ -76,60 +89,36 @@ def check_differences():
 
     print ("DIFFERENCES between current configuration and configuration in file: ", end="")
 
-    # get current configuration of the responder recipe
+    # get current configuration of the responder recipe (converted to dict to be compared with backup)
     response = CloudGuardClient.get_responder_recipe(responder_recipe_id=responder_recipe['id'])
-    current_recipe = response.data
-
-    # check differences in the display_name
-    if responder_recipe['display_name'] != current_recipe.display_name:
-        different = True
-        print ("")
-        print (f"- CURRENT display_name  : {current_recipe.display_name}")
-        print (f"- NEW     display_name  : {responder_recipe['display_name']}")
-
-    # check differences in the description
-    if responder_recipe['description'] != current_recipe.description:
-        different = True
-        print ("")
-        print (f"- CURRENT description   : {current_recipe.description}")
-        print (f"- NEW     description   : {responder_recipe['description']}")
+    current_recipe = oci.util.to_dict(response.data)
 
-    # check differences in the defined_tags
-    if responder_recipe['defined_tags'] != current_recipe.defined_tags:
-        different = True
-        print ("")
-        print (f"- CURRENT defined_tags  : {current_recipe.defined_tags}")
-        print (f"- NEW     defined_tags  : {responder_recipe['defined_tags']}")
-
-    # check differences in the freeform_tags
-    if responder_recipe['freeform_tags'] != current_recipe.freeform_tags:
-        different = True
-        print ("")
-        print (f"- CURRENT freeform_tags : {current_recipe.freeform_tags}")
-        print (f"- NEW     freeform_tags : {responder_recipe['freeform_tags']}")
+    # check differences in the display_name, description, defined_tags and freeform_tags
+    for field in recipe_fields:
+        if responder_recipe[field] != current_recipe[field]:
+            different = True
+            print ("")
+            print (f"- CURRENT {field:<13} : {current_recipe[field]}")
+            print (f"- NEW     {field:<13} : {responder_recipe[field]}")
 
     # check differences in each responder rule
-    for current_rule in current_recipe.effective_responder_rules:
-        rule_found = False
-        for new_rule in responder_recipe['effective_responder_rules']:
-            if new_rule['responder_rule_id'] == current_rule.responder_rule_id:
-                rule_found = True
-                break
+    new_rules_by_id = { r['responder_rule_id']: r for r in responder_recipe['effective_responder_rules'] }
+    for current_rule in current_recipe['effective_responder_rules']:
+        rule_id  = current_rule['responder_rule_id']
+        new_rule = new_rules_by_id.get(rule_id)
             
         # if the current rule ID does not exist in backup, stop the script
-        if not(rule_found):
-            print (f"ERROR: rule id {current_rule.responder_rule_id} not found in backup --> edit backup file, add this rule and re-run the script !")
-            exit (5)
-        # otherwise, check enabled status, risk level, settings and conditional group
-        else:
-
-            # comparing status: "details.is_enabled"
-            if current_rule.details.is_enabled != new_rule['details']['is_enabled']:
-                different = True
-                print ("")
-                print (f"- responder rule id {current_rule.responder_rule_id}")
-                print (f"  - CURRENT is_enabled : {current_rule.details.is_enabled}")
-                print (f"  - NEW     is_enabled : {new_rule['details']['is_enabled']}")
+        if new_rule is None:
+            print (f"ERROR: rule id {rule_id} not found in backup --> edit backup file, add this rule and re-run the script !")
+            sys.exit (5)
+
+        # otherwise, comparing status: "details.is_enabled"
+        if current_rule['details']['is_enabled'] != new_rule['details']['is_enabled']:
+            different = True
+            print ("")
+            print (f"- responder rule id {rule_id}")
+            print (f"  - CURRENT is_enabled : {current_rule['details']['is_enabled']}")
+            print (f"  - NEW     is_enabled : {new_rule['details']['is_enabled']}")
 
     # If differences are found, ask for confirmation before updating configuration
     # If not, simply stops the script
@@ -140,18 +129,19 @@ def check_differences():
         if resp != "y":
             print ("Update not confirmed, so stopping script now !")
             print ("")
-            exit (0)
+            sys.exit (0)
     else:
         print ("NONE")
         print ("")
         print ("No difference detected, so stopping script now !")
         print ("")
-        exit (0)
+        sys.exit (0)
 
 # -------- main
 
 # -- parse arguments
-parser = argparse.ArgumentParser(description = "Update a Cloud Guard responder recipe from a backup file")
+parser = argparse.ArgumentParser(description = "Update a Cloud Guard responder recipe from a backup file", epilog = help_epilog,
+                                 formatter_class = argparse.RawDescriptionHelpFormatter)
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
 parser.add_argument("-f", "--file", help="input file (.json)", required=True)
 args = parser.parse_args()
@@ -163,30 +153,25 @@ input_file = args.file
 my_file = Path(input_file)
 if not(my_file.is_file()):
     print (f"ERROR: the input backup file {input_file} does not exist or is not readable !")
-    exit (3)
+    sys.exit (3)
 
 # -- get info from profile    
 try:
-    config = oci.config.from_file(configfile,profile)
+    config = load_config(configfile,profile)
 except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
-    exit (2)
-
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
+    sys.exit (2)
 
 # -- Read detailed configuration from backup file
 try:
-    with open(input_file, 'r') as filein:
-        responder_recipe = json.load(filein)
-        print (f"Configuration successfully read from backup file {input_file} !")
+    responder_recipe = from_json_bytes(my_file.read_bytes())
+    print (f"Configuration successfully read from backup file {input_file} !")
 except OSError as err:
     print (f"ERROR: {err.strerror}")
-    exit (3)
-except json.decoder.JSONDecodeError as err:
+    sys.exit (3)
+except ValueError as err:
     print (f"ERROR in JSON input file: {err}")
-    exit (4)
+    sys.exit (4)
 
 # -- Display main characteristics of the responder recipe in the backup file
 print (f"- responder recipe name               : {responder_recipe['display_name']}")
@@ -210,11 +195,11 @@ try:
     response = CloudGuardClient.update_responder_recipe(
         responder_recipe_id = responder_recipe['id'], 
         update_responder_recipe_details = details_class,
-        retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY)
+        retry_strategy = retry_strategy)
     print ("Responder recipe configuration successfully restored/updated !")
 except Exception as err:
     print (f"ERROR: {err}")
-    exit (1)
+    sys.exit (1)
 
 # -- the end
-exit (0)
+sys.exit (0)
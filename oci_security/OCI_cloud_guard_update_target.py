@@ -20,6 +20,7 @@
 # Platforms     : MacOS / Linux
 # prerequisites : - Python 3 with OCI Python SDK installed
 #                 - OCI config file configured with profiles
+#                 - (optional) orjson Python module for faster reading of large backup files
 # Versions
 #    2021-11-19: Initial Version
 #    2022-01-03: use argparse to parse arguments
@@ -28,123 +29,167 @@
 # -------- import
 import oci
 import sys
-import json
 import argparse
 from pathlib import Path
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # -------- variables
 configfile = "~/.oci/config"    # Define config file to be used.
 different  = False              # Is configuration in backup file different from current configuration
+dirty_rules  = set()            # (recipe id, rule id) of rules whose configuration is different
+output_lines = []               # Differences found, displayed at once by flush_output()
+compared_fields = [ "display_name", "description", "defined_tags", "freeform_tags", "target_detector_recipes", "target_responder_recipes" ]
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for the update request (throttling and server errors)
+
+# -- keys required in the backup file (checked before any API call)
+target_keys           = [ "id", "display_name", "description", "defined_tags", "freeform_tags", "target_resource_id",
+                          "compartment_id", "recipe_count", "target_detector_recipes", "target_responder_recipes" ]
+detector_recipe_keys  = [ "id", "detector", "effective_detector_rules" ]
+detector_rule_keys    = [ "detector_rule_id", "details" ]
+detector_details_keys = [ "condition_groups" ]
+responder_recipe_keys = [ "id", "effective_responder_rules" ]
+responder_rule_keys   = [ "responder_rule_id", "details" ]
+responder_details_keys = [ "mode", "condition", "configurations" ]
+
+# -- notes displayed after the arguments help (argparse -h)
+help_epilog = f"""notes:
+- The OCID of the target to update is stored in the backup file
+- OCI_PROFILE must exist in {configfile} file (see example below)
+
+[EMEAOSC]
+tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx
+key_file    = /Users/cpauliat/.oci/api_key.pem
+region      = eu-frankfurt-1"""
 
 # -------- functions
-def usage():
-    print (f"Usage: {sys.argv[0]} -p OCI_PROFILE -f input_backup_file.json")
-    print ("")
-    print ("notes: ")
-    print ("- The OCID of the detector recipe to update is stored in the backup file")
-    print (f"- OCI_PROFILE must exist in {configfile} file (see example below)")
-    print ("")
-    print ("[EMEAOSC]")
-    print ("tenancy     = ocid1.tenancy.oc1..aaaaaaaaw7e6nkszrry6d5hxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("user        = ocid1.user.oc1..aaaaaaaayblfepjieoxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
-    print ("fingerprint = 19:1d:7b:3a:17:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx:xx")
-    print ("key_file    = /Users/cpauliat/.oci/api_key.pem")
-    print ("region      = eu-frankfurt-1")
-    exit (1)
+# ---- Display buffered output lines with a single write
+def flush_output():
+    if output_lines:
+        sys.stdout.write("\n".join(output_lines) + "\n")
+        output_lines.clear()
+
+# ---- Load a profile from an OCI config file (parsed only once for a given file and profile)
+@lru_cache(maxsize=8)
+def load_config(config_file, profile):
+    return oci.config.from_file(config_file, profile)
+
+# ---- Parse JSON content, using orjson if available
+def from_json_bytes(data):
+    if orjson:
+        return orjson.loads(data)
+    else:
+        return json.loads(data)
+
+# ---- Check that the backup file contains all the keys used by this script, return the first missing key (or None)
+def find_missing_key(target):
+    # list of (object, required keys, path of object in backup file) to check
+    checks = [ (target, target_keys, "") ]
+    for (recipes_key, recipe_keys, rules_key, rule_keys, details_keys) in [
+            ("target_detector_recipes",  detector_recipe_keys,  "effective_detector_rules",  detector_rule_keys,  detector_details_keys),
+            ("target_responder_recipes", responder_recipe_keys, "effective_responder_rules", responder_rule_keys, responder_details_keys) ]:
+        recipes = target.get(recipes_key) if isinstance(target, dict) else None
+        for i, recipe in enumerate(recipes or []):
+            checks.append((recipe, recipe_keys, f"{recipes_key}[{i}]."))
+            rules = recipe.get(rules_key) if isinstance(recipe, dict) else None
+            for j, rule in enumerate(rules or []):
+                checks.append((rule, rule_keys, f"{recipes_key}[{i}].{rules_key}[{j}]."))
+                details = rule.get("details") if isinstance(rule, dict) else None
+                checks.append((details, details_keys, f"{recipes_key}[{i}].{rules_key}[{j}].details."))
+
+    for (obj, keys, path) in checks:
+        for key in keys:
+            if not isinstance(obj, dict) or key not in obj:
+                return path + key
+    return None
 
 # ---- Get the full name of compartment from its id
-def get_cpt_parent(cpt):
-    if (cpt.id == RootCompartmentID):
-        return "root"
-    else:
-        for c in compartments:
-            if c.id == cpt.compartment_id:
-                break
-        return (c)
-
-def cpt_full_name(cpt):
-    if cpt.id == RootCompartmentID:
-        return ""
-    else:
-        # if direct child of root compartment
-        if cpt.compartment_id == RootCompartmentID:
-            return cpt.name
-        else:
-            parent_cpt = get_cpt_parent(cpt)
-            return cpt_full_name(parent_cpt)+":"+cpt.name
+def cpt_full_name(cpt_id):
+    # walk up the compartments tree until a direct child of root compartment
+    # or a compartment whose full name is already known
+    parents = []
+    cur_id  = cpt_id
+    while cur_id not in cpt_full_names and cur_id in cpt_by_id:
+        cpt = cpt_by_id[cur_id]
+        parents.append((cur_id, cpt.name))
+        cur_id = cpt.compartment_id
+
+    # then build full names from top to bottom, caching them for the intermediate compartments
+    prefix = cpt_full_names.get(cur_id, "")
+    for (cid, name) in reversed(parents):
+        prefix = prefix + ":" + name if prefix else name
+        cpt_full_names[cid] = prefix
+    return cpt_full_names[cpt_id]
 
 def get_cpt_full_name_from_id(cpt_id):
     if cpt_id == RootCompartmentID:
         return "root"
-    else:
-        for c in compartments:
-            if (c.id == cpt_id):
-                return cpt_full_name(c)
+    elif cpt_id in cpt_by_id:
+        return cpt_full_name(cpt_id)
     return
 
+# ---- Build condition class (oci.cloud_guard.models.SimpleCondition or CompositeCondition) from JSON content read in file
+def build_condition(condition):
+    if condition['kind'] == "SIMPLE":
+        return oci.cloud_guard.models.SimpleCondition(
+            kind       = "SIMPLE",
+            operator   = condition['operator'],
+            parameter  = condition['parameter'],
+            value      = condition['value'],
+            value_type = condition['value_type']
+        )
+    else:
+        # TO TEST
+        return oci.cloud_guard.models.CompositeCondition(
+            kind               = condition['kind'],
+            composite_operator = condition['composite_operator'],
+            left_operand       = condition['left_operand'],
+            right_operand      = condition['right_operand']
+        )
+
+# ---- Build list of oci.cloud_guard.models.ConditionGroup classes from JSON content read in file (None if no condition groups)
+def build_condition_groups(condition_groups):
+    if condition_groups == None:
+        return None
+    return [ oci.cloud_guard.models.ConditionGroup(
+                compartment_id = condition_group['compartment_id'],
+                condition      = build_condition(condition_group['condition']))
+             for condition_group in condition_groups ]
+
 # ---- Build class oci.cloud_guard.models.UpdateTargetDetails from JSON content read in file
+# ---- (all recipes are kept to avoid detaching them, but only rules with differences are included)
 def build_update_target_class():
 
     # 
-    target_detector_recipes = []
-    for target_detector_recipe in target['target_detector_recipes']: 
-        rules = []
-        for rule in target_detector_recipe['effective_detector_rules']:
-            # if we have conditions groups, use them
-            if rule['details']['condition_groups'] != None:
-                condition_groups = []
-                for condition_group in rule['details']['condition_groups']:
-                    if condition_group['condition']['kind'] == "SIMPLE":
-                        my_condition = oci.cloud_guard.models.SimpleCondition(
-                            kind       = "SIMPLE",
-                            operator   = condition_group['condition']['operator'],
-                            parameter  = condition_group['condition']['parameter'],
-                            value      = condition_group['condition']['value'],
-                            value_type = condition_group['condition']['value_type']
-                        )
-                    else:
-                        # TO TEST
-                        my_condition = oci.cloud_guard.models.CompositeCondition(
-                            kind               = condition_group['condition']['kind'],
-                            composite_operator = condition_group['condition']['composite_operator'],
-                            left_operand       = condition_group['condition']['left_operand'],
-                            right_operand      = condition_group['condition']['right_operand']
-                        )
-
-                    condition_groups.append(oci.cloud_guard.models.ConditionGroup(
-                        compartment_id = condition_group['compartment_id'],
-                        condition = my_condition)
-                    )
-            else:
-            # Otherwise, use None
-                condition_groups = None
-
-            rules.append(oci.cloud_guard.models.UpdateTargetRecipeDetectorRuleDetails(
-                detector_rule_id = rule['detector_rule_id'],
-                details = oci.cloud_guard.models.UpdateTargetDetectorRuleDetails(
-                    condition_groups = condition_groups)       
-            ))   
-        target_detector_recipes.append(oci.cloud_guard.models.UpdateTargetDetectorRecipe(
-            target_detector_recipe_id = target_detector_recipe['id'],
-            detector_rules = rules
-        ))
+    target_detector_recipes = [ oci.cloud_guard.models.UpdateTargetDetectorRecipe(
+        target_detector_recipe_id = target_detector_recipe['id'],
+        detector_rules = [ oci.cloud_guard.models.UpdateTargetRecipeDetectorRuleDetails(
+            detector_rule_id = rule['detector_rule_id'],
+            details = oci.cloud_guard.models.UpdateTargetDetectorRuleDetails(
+                condition_groups = build_condition_groups(rule['details']['condition_groups'])))
+            for rule in target_detector_recipe['effective_detector_rules']
+            if (target_detector_recipe['id'], rule['detector_rule_id']) in dirty_rules ])
+        for target_detector_recipe in target['target_detector_recipes'] ]
 
     # 
-    target_responder_recipes = []
-    for target_responder_recipe in target['target_responder_recipes']:  
-        rules = []
-        for rule in target_responder_recipe['effective_responder_rules']:
-            rules.append(oci.cloud_guard.models.UpdateTargetRecipeResponderRuleDetails(
-                responder_rule_id = rule['responder_rule_id'],
-                details = oci.cloud_guard.models.UpdateTargetResponderRuleDetails(
-                    mode           = rule['details']['mode'],
-                    condition      = rule['details']['condition'],
-                    configurations = rule['details']['configurations']) 
-            ))        
-        target_responder_recipes.append(oci.cloud_guard.models.UpdateTargetResponderRecipe(
-            target_responder_recipe_id = target_responder_recipe['id'],
-            responder_rules = rules
-        ))
+    target_responder_recipes = [ oci.cloud_guard.models.UpdateTargetResponderRecipe(
+        target_responder_recipe_id = target_responder_recipe['id'],
+        responder_rules = [ oci.cloud_guard.models.UpdateTargetRecipeResponderRuleDetails(
+            responder_rule_id = rule['responder_rule_id'],
+            details = oci.cloud_guard.models.UpdateTargetResponderRuleDetails(
+                mode           = rule['details']['mode'],
+                condition      = rule['details']['condition'],
+                configurations = rule['details']['configurations']))
+            for rule in target_responder_recipe['effective_responder_rules']
+            if (target_responder_recipe['id'], rule['responder_rule_id']) in dirty_rules ])
+        for target_responder_recipe in target['target_responder_recipes'] ]
 
     details = oci.cloud_guard.models.UpdateTargetDetails(
         defined_tags             = target['defined_tags'], 
@@ -159,60 +204,43 @@ def build_update_target_class():
 def check_differences_target_detector_recipes(current_target):
 
     l_different = False
+    new_detector_recipes_by_detector = { r['detector']: r for r in target['target_detector_recipes'] }
     for current_target_detector_recipe in current_target.target_detector_recipes:
 
         # find matching target detector recipe in backup file
-        detector_recipe_found = False
-        for new_detector_recipe in target['target_detector_recipes']:
-            if new_detector_recipe['detector'] == current_target_detector_recipe.detector:
-                detector_recipe_found = True
-                break
+        new_detector_recipe = new_detector_recipes_by_detector.get(current_target_detector_recipe.detector)
 
         # if no matching recipe found
-        if not(detector_recipe_found):
+        if new_detector_recipe is None:
             l_different = True
-            print ("")
-            print (f"- Target detector recipe {current_target_detector_recipe.detector}")
-            print ( "  - CURRENT : recipe exists")
-            print ( "  - NEW     : no recipe")   
+            output_lines.append("")
+            output_lines.append(f"- Target detector recipe {current_target_detector_recipe.detector}")
+            output_lines.append("  - CURRENT : recipe exists")
+            output_lines.append("  - NEW     : no recipe")
         # otherwise, we look for differences in detector rules condition_groups
         else:
+            new_rules_by_id = { r['detector_rule_id']: r for r in new_detector_recipe['effective_detector_rules'] }
             for current_rule in current_target_detector_recipe.effective_detector_rules:
-                rule_found = False
-                for new_rule in new_detector_recipe['effective_detector_rules']:
-                    if new_rule['detector_rule_id'] == current_rule.detector_rule_id:
-                        rule_found = True
-                        break
+                new_rule = new_rules_by_id.get(current_rule.detector_rule_id)
             
                 # if the current rule ID does not exist in backup, stop the script
-                if not(rule_found):
+                if new_rule is None:
+                    flush_output()
                     print (f"ERROR: rule id {current_rule.detector_rule_id} not found in backup --> edit backup file, add this rule and re-run the script !")
-                    exit (5)
+                    sys.exit (5)
                 # otherwise, check condition_groups
                 else:
-                    # comparing condition_groups parameter if it exists
-                    if current_rule.details.condition_groups == None:
-                        current_condition_groups_dict = None
-                    else:
-                        current_condition_groups_dict = []
-                        for current_condition_group in current_rule.details.condition_groups:
-                            current_condition_dict = {}
-                            current_condition_dict['kind']       = current_condition_group.condition.kind
-                            current_condition_dict['operator']   = current_condition_group.condition.operator
-                            current_condition_dict['parameter']  = current_condition_group.condition.parameter
-                            current_condition_dict['value']      = current_condition_group.condition.value
-                            current_condition_dict['value_type'] = current_condition_group.condition.value_type
-
-                            current_condition_groups_dict.append(
-                                { 'compartment_id' : current_condition_group.compartment_id, 'condition': current_condition_dict })
+                    # comparing condition_groups parameter if it exists (same dict format as in backup file)
+                    current_condition_groups_dict = oci.util.to_dict(current_rule.details.condition_groups)
 
                     if current_condition_groups_dict != new_rule['details']['condition_groups']:
                         l_different = True
-                        print ("")    
-                        print (f"- Target detector recipe {current_target_detector_recipe.detector}")
-                        print (f"  - Detector rule id {current_rule.detector_rule_id}")
-                        print (f"    - CURRENT condition : {current_condition_groups_dict}")
-                        print (f"    - NEW     condition : {new_rule['details']['condition_groups']}")
+                        dirty_rules.add((new_detector_recipe['id'], current_rule.detector_rule_id))
+                        output_lines.append("")
+                        output_lines.append(f"- Target detector recipe {current_target_detector_recipe.detector}")
+                        output_lines.append(f"  - Detector rule id {current_rule.detector_rule_id}")
+                        output_lines.append(f"    - CURRENT condition : {current_condition_groups_dict}")
+                        output_lines.append(f"    - NEW     condition : {new_rule['details']['condition_groups']}")
 
     return l_different
 
@@ -225,126 +253,120 @@ def check_differences_target_responder_recipes(current_target):
     # so if len() is different, then a recipe is missing in current target or backup target
     if len(current_target.target_responder_recipes) != len(target['target_responder_recipes']):
         l_different = True
-        print ("")
-        print ("- Target responder recipe ")
+        output_lines.append("")
+        output_lines.append("- Target responder recipe ")
         if len(current_target.target_responder_recipes) == 0:
-            print ("  - CURRENT : no recipe")
-            print ("  - NEW     : recipe exists")  
+            output_lines.append("  - CURRENT : no recipe")
+            output_lines.append("  - NEW     : recipe exists")
         else:
-            print ("  - CURRENT : recipe exists")
-            print ("  - NEW     : no recipe")  
+            output_lines.append("  - CURRENT : recipe exists")
+            output_lines.append("  - NEW     : no recipe")
     
     else:
     # otherwise, the responder recipe is present in both targets
     # so we then compare responder rules
-        # find matching target detector recipe in backup file
+        new_responder_recipe_id = target['target_responder_recipes'][0]['id']
+        new_rules_by_id = { r['responder_rule_id']: r for r in target['target_responder_recipes'][0]['effective_responder_rules'] }
         for current_rule in current_target.target_responder_recipes[0].effective_responder_rules:
-            rule_found = False
             # find matching rule backup file
-            for new_rule in target['target_responder_recipes'][0]['effective_responder_rules']:
-                if new_rule['responder_rule_id'] == current_rule.responder_rule_id:
-                    rule_found = True
-                    break
+            new_rule = new_rules_by_id.get(current_rule.responder_rule_id)
         
             # if the current rule ID does not exist in backup, stop the script
-            if not(rule_found):
+            if new_rule is None:
+                flush_output()
                 print (f"ERROR: rule id {current_rule.responder_rule_id} not found in backup --> edit backup file, add this rule and re-run the script !")
-                exit (5)
+                sys.exit (5)
             # otherwise, check mode, condition and configurations
             else:
                 # comparing mode
                 if current_rule.details.mode != new_rule['details']['mode']:
                     l_different = True
-                    print ("")    
-                    print (f"- Target responder recipe")
-                    print (f"  - Responder rule id {current_rule.responder_rule_id}")
-                    print (f"    - CURRENT condition : {current_rule.details.mode}")
-                    print (f"    - NEW     condition : {new_rule['details']['mode']}")
+                    dirty_rules.add((new_responder_recipe_id, current_rule.responder_rule_id))
+                    output_lines.append("")
+                    output_lines.append(f"- Target responder recipe")
+                    output_lines.append(f"  - Responder rule id {current_rule.responder_rule_id}")
+                    output_lines.append(f"    - CURRENT condition : {current_rule.details.mode}")
+                    output_lines.append(f"    - NEW     condition : {new_rule['details']['mode']}")
 
                 # comparing condition (conditional group) if it exists
-                if current_rule.details.condition != None:
-                    current_condition_dict = {}
-                    current_condition_dict['kind']       = current_rule.details.condition.kind
-                    current_condition_dict['operator']   = current_rule.details.condition.operator
-                    current_condition_dict['parameter']  = current_rule.details.condition.parameter
-                    current_condition_dict['value']      = current_rule.details.condition.value
-                    current_condition_dict['value_type'] = current_rule.details.condition.value_type
-                else:
-                    current_condition_dict = None
+                current_condition_dict = oci.util.to_dict(current_rule.details.condition)
 
                 if current_condition_dict != new_rule['details']['condition']:
                     l_different = True
-                    print ("")    
-                    print (f"- Target responder recipe")
-                    print (f"  - Responder rule id {current_rule.responder_rule_id}")
-                    print (f"    - CURRENT condition : {current_condition_dict}")
-                    print (f"    - NEW     condition : {new_rule['details']['condition']}")
+                    dirty_rules.add((new_responder_recipe_id, current_rule.responder_rule_id))
+                    output_lines.append("")
+                    output_lines.append(f"- Target responder recipe")
+                    output_lines.append(f"  - Responder rule id {current_rule.responder_rule_id}")
+                    output_lines.append(f"    - CURRENT condition : {current_condition_dict}")
+                    output_lines.append(f"    - NEW     condition : {new_rule['details']['condition']}")
 
                 # comparing configurations
-                current_configurations_list = []
-                for current_configuration in current_rule.details.configurations:
-                    current_configuration_dict = {}
-                    current_configuration_dict['config_key'] = current_configuration.config_key
-                    current_configuration_dict['name']       = current_configuration.name
-                    current_configuration_dict['value']      = current_configuration.value
-                    current_configurations_list.append(current_configuration_dict)
+                current_configurations_list = oci.util.to_dict(current_rule.details.configurations)
 
                 if current_configurations_list != new_rule['details']['configurations']:
                     l_different = True
-                    print ("")    
-                    print (f"- Target responder recipe")
-                    print (f"  - Responder rule id {current_rule.responder_rule_id}")
-                    print (f"    - CURRENT configurations : {current_configurations_list}")
-                    print (f"    - NEW     configurations : {new_rule['details']['configurations']}")
+                    dirty_rules.add((new_responder_recipe_id, current_rule.responder_rule_id))
+                    output_lines.append("")
+                    output_lines.append(f"- Target responder recipe")
+                    output_lines.append(f"  - Responder rule id {current_rule.responder_rule_id}")
+                    output_lines.append(f"    - CURRENT configurations : {current_configurations_list}")
+                    output_lines.append(f"    - NEW     configurations : {new_rule['details']['configurations']}")
 
     return l_different
 
 # ---- Check target differences between current configuration and configuration in backup file
-def check_differences():
+def check_differences(current_target):
 
     global different
 
     print ("DIFFERENCES between current configuration and configuration in file: ", end="")
 
-    # get current configuration of the target
-    response = CloudGuardClient.get_target(target_id=target['id'])
-    current_target = response.data
-
-    # check differences in the display_name
-    if target['display_name'] != current_target.display_name:
-        different = True
-        print ("")
-        print (f"- CURRENT display_name  : {current_target.display_name}")
-        print (f"- NEW     display_name  : {target['display_name']}")
-
-    # check differences in the description
-    if target['description'] != current_target.description:
-        different = True
-        print ("")
-        print (f"- CURRENT description   : {current_target.description}")
-        print (f"- NEW     description   : {target['description']}")
-
-    # check differences in the defined_tags
-    if target['defined_tags'] != current_target.defined_tags:
-        different = True
-        print ("")
-        print (f"- CURRENT defined_tags  : {current_target.defined_tags}")
-        print (f"- NEW     defined_tags  : {target['defined_tags']}")
-
-    # check differences in the freeform_tags
-    if target['freeform_tags'] != current_target.freeform_tags:
-        different = True
-        print ("")
-        print (f"- CURRENT freeform_tags : {current_target.freeform_tags}")
-        print (f"- NEW     freeform_tags : {target['freeform_tags']}")
-
-    # check rules differences in target_detector_recipes (only condition_groups)
-    if check_differences_target_detector_recipes(current_target):
-        different = True
-
-    # check rules differences in target_responder_recipes (only mode, conditions, configurations)
-    if check_differences_target_responder_recipes(current_target):
-        different = True
+    # fast path: compare the whole target with the backup file (where detector/responder rules are emptied)
+    # and only look for detailed differences if they are not identical
+    current_target_dict = oci.util.to_dict(current_target)
+    for r in current_target_dict['target_detector_recipes']:
+        r['detector_rules'] = []
+    for r in current_target_dict['target_responder_recipes']:
+        r['responder_rules'] = []
+    if any(current_target_dict[field] != target[field] for field in compared_fields):
+        # check differences in the display_name
+        if target['display_name'] != current_target.display_name:
+            different = True
+            output_lines.append("")
+            output_lines.append(f"- CURRENT display_name  : {current_target.display_name}")
+            output_lines.append(f"- NEW     display_name  : {target['display_name']}")
+
+        # check differences in the description
+        if target['description'] != current_target.description:
+            different = True
+            output_lines.append("")
+            output_lines.append(f"- CURRENT description   : {current_target.description}")
+            output_lines.append(f"- NEW     description   : {target['description']}")
+
+        # check differences in the defined_tags
+        if target['defined_tags'] != current_target.defined_tags:
+            different = True
+            output_lines.append("")
+            output_lines.append(f"- CURRENT defined_tags  : {current_target.defined_tags}")
+            output_lines.append(f"- NEW     defined_tags  : {target['defined_tags']}")
+
+        # check differences in the freeform_tags
+        if target['freeform_tags'] != current_target.freeform_tags:
+            different = True
+            output_lines.append("")
+            output_lines.append(f"- CURRENT freeform_tags : {current_target.freeform_tags}")
+            output_lines.append(f"- NEW     freeform_tags : {target['freeform_tags']}")
+
+        # check rules differences in target_detector_recipes (only condition_groups)
+        if check_differences_target_detector_recipes(current_target):
+            different = True
+
+        # check rules differences in target_responder_recipes (only mode, conditions, configurations)
+        if check_differences_target_responder_recipes(current_target):
+            different = True
+
+    # display all differences found at once
+    flush_output()
 
     # If differences are found, ask for confirmation before updating configuration
     # If not, simply stops the script
@@ -355,18 +377,19 @@ def check_differences():
         if resp != "y":
             print ("Update not confirmed, so stopping script now !")
             print ("")
-            exit (0)
+            sys.exit (0)
     else:
         print ("NONE")
         print ("")
         print ("No difference detected, so stopping script now !")
         print ("")
-        exit (0)
+        sys.exit (0)
 
 # -------- main
 
 # -- parse arguments
-parser = argparse.ArgumentParser(description = "Update a Cloud Guard target from a backup file")
+parser = argparse.ArgumentParser(description = "Update a Cloud Guard target from a backup file", epilog = help_epilog,
+                                 formatter_class = argparse.RawDescriptionHelpFormatter)
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
 parser.add_argument("-f", "--file", help="input file (.json)", required=True)
 args = parser.parse_args()
@@ -378,34 +401,45 @@ input_file = args.file
 my_file = Path(input_file)
 if not(my_file.is_file()):
     print (f"ERROR: the input backup file {input_file} does not exist or is not readable !")
-    exit (3)
+    sys.exit (3)
 
 # -- get info from profile    
 try:
-    config = oci.config.from_file(configfile,profile)
+    config = load_config(configfile,profile)
 except:
     print (f"ERROR: profile '{profile}' not found in config file {configfile} !")
-    exit (2)
-
-IdentityClient = oci.identity.IdentityClient(config)
-user = IdentityClient.get_user(config["user"]).data
-RootCompartmentID = user.compartment_id
-
-# -- get list of compartments with all sub-compartments
-response = oci.pagination.list_call_get_all_results(IdentityClient.list_compartments,RootCompartmentID,compartment_id_in_subtree=True)
-compartments = response.data
+    sys.exit (2)
 
 # -- Read detailed configuration from backup file
 try:
-    with open(input_file, 'r') as filein:
-        target = json.load(filein)
-        print (f"Configuration successfully read from backup file {input_file} !")
+    target = from_json_bytes(my_file.read_bytes())
+    print (f"Configuration successfully read from backup file {input_file} !")
 except OSError as err:
     print (f"ERROR: {err.strerror}")
-    exit (3)
-except json.decoder.JSONDecodeError as err:
+    sys.exit (3)
+except ValueError as err:
     print (f"ERROR in JSON input file: {err}")
-    exit (4)
+    sys.exit (4)
+
+# -- Make sure the backup file has the expected structure before any API call
+missing_key = find_missing_key(target)
+if missing_key != None:
+    print (f"ERROR in JSON input file: missing key {missing_key}")
+    sys.exit (4)
+
+# -- OCI clients (root compartment OCID is the tenancy OCID)
+IdentityClient    = oci.identity.IdentityClient(config)
+CloudGuardClient  = oci.cloud_guard.CloudGuardClient(config)
+RootCompartmentID = config["tenancy"]
+
+# -- get list of compartments with all sub-compartments and current configuration of the target in parallel
+with ThreadPoolExecutor(max_workers=2) as executor:
+    future_cpts   = executor.submit(oci.pagination.list_call_get_all_results, IdentityClient.list_compartments, RootCompartmentID, compartment_id_in_subtree=True, access_level="ACCESSIBLE", lifecycle_state="ACTIVE")
+    future_target = executor.submit(CloudGuardClient.get_target, target_id=target['id'])
+    compartments   = future_cpts.result().data
+    current_target = future_target.result().data
+cpt_by_id = { c.id: c for c in compartments }
+cpt_full_names = {}         # cache of compartments full names, shared by compartments with common ancestors
 
 # -- Display main characteristics of the target in the backup file
 print (f"- target name          : {target['display_name']}")
@@ -416,12 +450,9 @@ print (f"- compartment          : {get_cpt_full_name_from_id(target['compartment
 print (f"- recipe count         : {target['recipe_count']}")
 print ("")
 
-# -- CloudGuardClient
-CloudGuardClient = oci.cloud_guard.CloudGuardClient(config)
-
 # -- Display differences between current configuration and configuration in backup file
 # -- Stop script if no difference found, or if difference found but update not confirmed
-check_differences()
+check_differences(current_target)
 
 # -- Build class oci.cloud_guard.models.UpdateTargetDetails from JSON content read in file
 details_class = build_update_target_class()
@@ -431,11 +462,11 @@ try:
     response = CloudGuardClient.update_target(
         target_id = target['id'], 
         update_target_details = details_class,
-        retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY)
+        retry_strategy = retry_strategy)
     print ("Target configuration successfully restored/updated !")
 except Exception as err:
    print (f"ERROR: {err}")
-   exit (1)
+   sys.exit (1)
 
 # -- the end
-exit (0)
+sys.exit (0)
@@ -7,16 +7,47 @@
 # Platforms     : MacOS / Linux
 # prerequisites : - Python 3 with OCI Python SDK installed
 #                 - OCI config file configured with profiles
+#                 - (optional) pybase64 Python module for faster (SIMD) decoding of messages
+#                 - (optional) ijson Python module for low memory mode (-lm option)
 # Versions
 #    2020-11-17: Initial Version
 #    2022-01-03: use argparse to parse arguments
+#    2026-10-16: read all available messages (by batches), prefetching next batch while displaying current one
+#    2026-10-16: add -l/--limit option (default 10000 messages per batch instead of 300)
+#    2026-10-16: add -m/--max_messages and -f/--follow options
+#    2026-10-16: format each message with a single precomputed template (1 write per message)
+#    2026-10-16: write formatted messages to stdout by groups of 64
+#    2026-10-16: add -lm/--low_memory option (parse and display messages one by one using ijson)
+#    2026-10-16: retry OCI requests on throttling and server errors
+#    2026-10-16: get messages endpoint from the stream details (cached) instead of using cell-1 endpoint
+#    2026-10-16: read several partitions in parallel (-pt with comma separated list of partitions)
+#    2026-10-16: stop reading partitions on error instead of hanging (e.g. broken pipe)
+#    2026-10-16: add -r/--raw option (length-prefixed decoded values only, for use in pipelines)
+#    2026-10-16: low memory mode: same output as default mode (batch header, timestamp format)
 # --------------------------------------------------------------------------------------------------------------
 
 # -------- import
 import oci
 import sys
+import time
 import argparse
-from base64 import b64encode, b64decode
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from struct import pack
+from pathlib import Path
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+try:
+    import ijson
+except ImportError:
+    ijson = None
+from concurrent.futures import ThreadPoolExecutor
 
 # -------- colors for output
 COLOR_YELLOW="\033[93m"
@@ -29,7 +60,24 @@ COLOR_GREY="\033[90m"
 
 # -------- variables
 configfile  = "~/.oci/config"    # OCI config file to be used
-nb_messages = 300                # Max nb of message to be read
+max_limit   = 10000              # Max nb of messages per get_messages call allowed by OCI Streaming service
+poll_interval = 1                # Delay (in seconds) before polling again when no new message (follow mode)
+queue_timeout = 0.5              # Delay (in seconds) between 2 checks of the stop flag when the queue of batches is full
+write_every = 64                 # Nb of formatted messages joined before each write to stdout
+spool_size  = 8 * 1024 * 1024    # Max size (in bytes) of formatted messages of a batch kept in memory (low memory mode)
+retry_strategy = oci.retry.DEFAULT_RETRY_STRATEGY  # Retry strategy for all OCI requests (throttling and server errors)
+log         = sys.stdout         # Output for information messages (stderr in raw mode so that stdout only contains messages)
+
+# -- header displayed before each batch of messages (nb of messages in the batch)
+batch_header = COLOR_RED+"==== Reading "+COLOR_CYAN+"{}"+COLOR_RED+" messages"+COLOR_NORMAL
+
+# -- output format for 1 message (built once): partition, offset, date, key and value (bytes)
+message_format = (COLOR_GREEN+"PARTITION : "+COLOR_YELLOW+" %b\n"+
+                  COLOR_GREEN+"OFFSET    : "+COLOR_YELLOW+" %b\n"+
+                  COLOR_GREEN+"DATE      : "+COLOR_CYAN+" %b\n"+
+                  COLOR_GREEN+"KEY       : "+COLOR_CYAN+" %b\n"+
+                  COLOR_GREEN+"MESSAGE   : "+COLOR_NORMAL+" %b\n"+
+                  COLOR_YELLOW+"----------"+COLOR_NORMAL+"\n").encode()
 
 # -------- functions
 def usage():
@@ -47,20 +95,291 @@ def usage():
     print ("region      = eu-frankfurt-1")
     exit (1)
 
+# ---- Get the messages endpoint of a stream (depends on the stream cell, so cannot be built from the region)
+# ---- (endpoints kept in a local cache file to avoid the get_stream request on next runs)
+def get_messages_endpoint(config, stream_id):
+    cache_file = Path.home() / ".oci" / "cache" / "stream_endpoints.json"
+
+    try:
+        with open(cache_file, 'r') as filein:
+            endpoints = json.load(filein)
+    except (OSError, ValueError):
+        endpoints = {}
+    if stream_id in endpoints:
+        return endpoints[stream_id]
+
+    StreamAdminClient = oci.streaming.StreamAdminClient(config, retry_strategy=retry_strategy)
+    endpoints[stream_id] = StreamAdminClient.get_stream(stream_id).data.messages_endpoint
+
+    # write the cache file atomically (temporary file then rename)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as fileout:
+            json.dump(endpoints, fileout)
+        os.replace(tmp_file, cache_file)
+    except OSError as err:
+        print ("WARNING: cannot write stream endpoints cache file {} ({})".format(cache_file, err), file=log)
+
+    return endpoints[stream_id]
+
+# ---- Decode the base64 values of a batch of messages
+# ---- Values without padding (length multiple of 4, no "=") are joined and decoded in a single call,
+# ---- then split using offsets (3 bytes per 4 chars). Padded values cannot be concatenated and are
+# ---- decoded one by one.
+def decode_values(messages):
+    decoded_values = [None] * len(messages)
+    unpadded       = [i for i, message in enumerate(messages) if not message.value.endswith("=") and len(message.value) % 4 == 0]
+    if unpadded:
+        decoded = b64decode("".join([messages[i].value for i in unpadded]))
+        offset  = 0
+        for i in unpadded:
+            length = len(messages[i].value) // 4 * 3
+            decoded_values[i] = decoded[offset:offset+length]
+            offset += length
+    for i, message in enumerate(messages):
+        if decoded_values[i] is None:
+            decoded_values[i] = b64decode(message.value)
+    return decoded_values
+
+# ---- Display a batch of messages
+def display_messages(messages):
+    print(batch_header.format(len(messages)))
+
+    # decoded keys and values are written as bytes (no conversion to str, no error on non UTF-8 payloads)
+    sys.stdout.flush()
+    out    = sys.stdout.buffer
+    decode = b64decode
+    decoded_values = decode_values(messages)
+    lines  = []
+    for message, decoded_value in zip(messages, decoded_values):
+        # print raw JSON message
+        # print (message)
+        if message.key:
+            decoded_key = decode(message.key)
+        else:
+            decoded_key = b"null"
+
+        lines.append(message_format % (str(message.partition).encode(), str(message.offset).encode(),
+                                       str(message.timestamp).encode(), decoded_key, decoded_value))
+        if len(lines) >= write_every:
+            out.write(b"".join(lines))
+            lines.clear()
+    out.write(b"".join(lines))
+    out.flush()
+
+# ---- Write a batch of messages in raw format (no colors, no key, no header): for each message,
+# ---- the length of the decoded value (4 bytes, big endian) followed by the decoded value
+def display_raw(messages):
+    out = sys.stdout.buffer
+    out.write(b"".join([ pack(">I", len(value)) + value for value in decode_values(messages) ]))
+    out.flush()
+
+# ---- Read messages from the stream starting at cursor, until no more message is available
+# ---- (or forever if follow is True), or until max_messages messages are read (if not None)
+# ---- or until the stop event (if given) is set
+# ---- The next batch is requested in the background while the current batch is displayed
+# ---- Each batch is given to display (display_messages by default)
+def consume(StreamClient, stream_id, cursor, max_messages=None, follow=False, display=display_messages, stop=None):
+    remaining = max_messages
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        response = StreamClient.get_messages(stream_id, cursor, limit=batch_limit(remaining))
+        while stop == None or not stop.is_set():
+            messages = response.data
+            if remaining != None:
+                messages   = messages[:remaining]
+                remaining -= len(messages)
+
+            # stop if all requested messages are read, or if no more message available (unless follow)
+            if remaining == 0 or (len(messages) == 0 and not follow):
+                if len(messages) > 0:
+                    display(messages)
+                break
+
+            # no new message: wait before polling again
+            if len(messages) == 0:
+                if stop == None:
+                    time.sleep(poll_interval)
+                elif stop.wait(poll_interval):
+                    break
+
+            next_cursor = response.headers['opc-next-cursor']
+            future = executor.submit(StreamClient.get_messages, stream_id, next_cursor, limit=batch_limit(remaining))
+            if len(messages) > 0:
+                display(messages)
+            response = future.result()
+
+# ---- Put an item in a bounded queue, giving up (False returned) if the stop event is set
+def put_unless_stopped(batches, item, stop):
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=queue_timeout)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+# ---- Read messages from a partition and put batches in a queue
+# ---- None is put at the end, or the exception if reading failed
+# ---- Stops as soon as the stop event is set (by the main thread on error)
+def consume_to_queue(StreamClient, stream_id, cursor, max_messages, follow, batches, stop):
+    end = None
+    try:
+        consume(StreamClient, stream_id, cursor, max_messages, follow,
+                display=lambda messages: put_unless_stopped(batches, messages, stop), stop=stop)
+    except Exception as err:
+        end = err
+    put_unless_stopped(batches, end, stop)
+
+# ---- Read messages from several partitions in parallel (1 thread per partition, each with its own prefetch)
+# ---- Batches are displayed by the calling thread only (through a queue), so output of partitions is not mixed
+# ---- On error (in display or in a partition thread), all threads are stopped and the error is raised
+def consume_partitions(StreamClient, stream_id, cursors, max_messages=None, follow=False, display=display_messages):
+    batches = queue.Queue(maxsize=2*len(cursors))
+    stop    = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(cursors)) as executor:
+        try:
+            for cursor in cursors:
+                executor.submit(consume_to_queue, StreamClient, stream_id, cursor, max_messages, follow, batches, stop)
+            running = len(cursors)
+            while running > 0:
+                messages = batches.get()
+                if messages == None:
+                    running -= 1
+                elif isinstance(messages, Exception):
+                    raise messages
+                else:
+                    display(messages)
+        finally:
+            # stop the partition threads and unblock those waiting for room in the queue
+            stop.set()
+            while True:
+                try:
+                    batches.get_nowait()
+                except queue.Empty:
+                    break
+
+# ---- Same as consume() but without loading a full batch of messages in memory:
+# ---- the JSON array returned by OCI is parsed incrementally (ijson) and each message is formatted
+# ---- as soon as it is parsed (no prefetch of next batch in this mode). As the header of a batch
+# ---- contains its nb of messages, formatted messages are kept in a spooled temporary file
+# ---- (on disk above spool_size bytes) until the end of the batch, then written after the header
+def consume_low_memory(StreamClient, stream_id, cursor, max_messages=None, follow=False, raw_output=False):
+    remaining   = max_messages
+    out         = sys.stdout.buffer
+    deserialize = StreamClient.base_client.deserialize_data
+    while remaining == None or remaining > 0:
+        response = retry_strategy.make_retrying_call(StreamClient.base_client.call_api,
+            resource_path="/streams/{streamId}/messages",
+            method="GET",
+            path_params={ "streamId": stream_id },
+            query_params={ "cursor": cursor, "limit": batch_limit(remaining) },
+            header_params={ "accept": "application/json" },
+            response_type="stream")
+        try:
+            raw = response.data.raw
+            raw.decode_content = True
+
+            with tempfile.SpooledTemporaryFile(max_size=spool_size) as spool:
+                nb    = 0
+                lines = []
+                for message in ijson.items(raw, "item"):
+                    if raw_output:
+                        decoded_value = b64decode(message["value"])
+                        lines.append(pack(">I", len(decoded_value)) + decoded_value)
+                    else:
+                        if message.get("key"):
+                            decoded_key = b64decode(message["key"])
+                        else:
+                            decoded_key = b"null"
+                        # same timestamp format as in default mode (datetime built by the SDK)
+                        timestamp = deserialize(message["timestamp"], "datetime")
+                        lines.append(message_format % (str(message["partition"]).encode(), str(message["offset"]).encode(),
+                                                       str(timestamp).encode(), decoded_key, b64decode(message["value"])))
+                    nb += 1
+                    if len(lines) >= write_every:
+                        spool.write(b"".join(lines))
+                        lines.clear()
+                spool.write(b"".join(lines))
+
+                # same output as display_messages() or display_raw() for the batch
+                if nb > 0:
+                    if not raw_output:
+                        print(batch_header.format(nb))
+                    sys.stdout.flush()
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, out)
+                    out.flush()
+        finally:
+            response.data.close()
+
+        if remaining != None:
+            remaining -= nb
+
+        # stop if no more message available (unless follow), or wait before polling again
+        if nb == 0:
+            if not follow:
+                break
+            time.sleep(poll_interval)
+        cursor = response.headers['opc-next-cursor']
+
+# ---- Create a cursor for a partition, at the given offset or at the oldest message (offset "all")
+def create_cursor(StreamClient, stream_id, partition, offset):
+    print(COLOR_RED+"==== Creating a cursor for partition "+COLOR_CYAN+partition+COLOR_RED+" ",end="", file=log)
+    if offset == "all":
+        print ("of type = "+COLOR_CYAN+"TRIM_HORIZON"+COLOR_NORMAL, file=log)
+        cursor_details = oci.streaming.models.CreateCursorDetails(
+            partition=partition,
+            type=oci.streaming.models.CreateCursorDetails.TYPE_TRIM_HORIZON)
+    else:
+        print ("of type = "+COLOR_CYAN+"AT_OFFSET"+COLOR_NORMAL, file=log)
+        cursor_details = oci.streaming.models.CreateCursorDetails(
+            partition=partition,
+            type=oci.streaming.models.CreateCursorDetails.TYPE_AT_OFFSET,
+            offset=int(offset))
+    response = StreamClient.create_cursor(stream_id, cursor_details)
+    return response.data.value
+
+# ---- Nb of messages to request in next batch
+def batch_limit(remaining):
+    if remaining == None:
+        return nb_messages
+    return min(nb_messages, remaining)
+
 # -------- main
 
 # -- parsing arguments
 parser = argparse.ArgumentParser(description = "Read messages from an OCI stream")
 parser.add_argument("-p", "--profile", help="OCI profile", required=True)
 parser.add_argument("-s", "--stream_ocid", help="Stream OCID", required=True)
-parser.add_argument("-pt", "--partition", help="Stream Partition", required=True)
-parser.add_argument("-o", "--offset", help="offset in partition (use 'all' to read all partition)", required=True)
+parser.add_argument("-pt", "--partition", "--partitions", help="Stream Partition (or comma separated list of partitions read in parallel)", required=True)
+parser.add_argument("-o", "--offset", help="offset in partition(s) (use 'all' to read all partition)", required=True)
+parser.add_argument("-m", "--max_messages", help="Stop after reading this nb of messages (in each partition)", type=int)
+parser.add_argument("-f", "--follow", help="Keep waiting for new messages instead of stopping at the end of the partition", action="store_true")
+parser.add_argument("-lm", "--low_memory", help="Parse and display messages one by one instead of loading full batches in memory (needs ijson module)", action="store_true")
+parser.add_argument("-r", "--raw", help="Write only decoded message values, each one preceded by its length (4 bytes, big endian)", action="store_true")
+parser.add_argument("-l", "--limit", help=f"Max nb of messages read in each batch (1 to {max_limit}, default {max_limit}; larger batches use more memory)", type=int, default=max_limit)
 args = parser.parse_args()
 
 profile   = args.profile
 stream_id = args.stream_ocid
-partition = args.partition
+partitions = [ p.strip() for p in args.partition.split(",") if p.strip() ]
 offset    = args.offset
+nb_messages = min(max(args.limit, 1), max_limit)
+if args.raw:
+    log = sys.stderr
+if args.max_messages != None and args.max_messages < 1:
+    print ("ERROR: max_messages must be at least 1 !")
+    exit (3)
+if args.low_memory and ijson == None:
+    print ("WARNING: ijson module not installed, low memory mode disabled !", file=log)
+    args.low_memory = False
+if len(partitions) == 0:
+    print ("ERROR: at least 1 partition must be given !")
+    exit (3)
+if args.low_memory and len(partitions) > 1:
+    print ("WARNING: low memory mode not available when reading several partitions, disabled !", file=log)
+    args.low_memory = False
 
 # -- get OCI Config
 try:
@@ -70,44 +389,20 @@ except:
     exit (2)
 
 # -- Stream client
-endpoint = "https://cell-1.streaming."+config["region"]+".oci.oraclecloud.com"
-StreamClient = oci.streaming.StreamClient(config, endpoint)
-
-# -- Create a cursor
-print(COLOR_RED+"==== Creating a cursor ",end="")
-if offset == "all":
-    print ("of type = "+COLOR_CYAN+"TRIM_HORIZON"+COLOR_NORMAL)
-    cursor_details = oci.streaming.models.CreateCursorDetails(
-        partition=partition,
-        type=oci.streaming.models.CreateCursorDetails.TYPE_TRIM_HORIZON)
-else:
-    print ("of type = "+COLOR_CYAN+"AT_OFFSET"+COLOR_NORMAL)
-    cursor_details = oci.streaming.models.CreateCursorDetails(
-        partition=partition,
-        type=oci.streaming.models.CreateCursorDetails.TYPE_AT_OFFSET,
-        offset=int(offset))
-response = StreamClient.create_cursor(stream_id, cursor_details)
-cursor = response.data.value
+endpoint = get_messages_endpoint(config, stream_id)
+StreamClient = oci.streaming.StreamClient(config, endpoint, retry_strategy=retry_strategy)
+
+# -- Create a cursor for each partition
+cursors = [ create_cursor(StreamClient, stream_id, partition, offset) for partition in partitions ]
 
 # -- Read messages from the stream
-response = StreamClient.get_messages(stream_id, cursor, limit=nb_messages)
-if len(response.data) > 0:
-    print(COLOR_RED+"==== Reading "+COLOR_CYAN+"{}".format(len(response.data))+COLOR_RED+" messages"+COLOR_NORMAL)
-    for message in response.data:
-        # print raw JSON message
-        # print (message)
-        if message.key:
-            decoded_key = b64decode(message.key.encode()).decode()
-        else:
-            decoded_key = "null"
-        decoded_value = b64decode(message.value.encode()).decode()
-
-        print (COLOR_GREEN+"PARTITION : "+COLOR_YELLOW,message.partition)
-        print (COLOR_GREEN+"OFFSET    : "+COLOR_YELLOW,message.offset)
-        print (COLOR_GREEN+"DATE      : "+COLOR_CYAN,message.timestamp)
-        print (COLOR_GREEN+"KEY       : "+COLOR_CYAN,decoded_key)
-        print (COLOR_GREEN+"MESSAGE   : "+COLOR_NORMAL,decoded_value)
-        print (COLOR_YELLOW+"----------"+COLOR_NORMAL)
+display = display_raw if args.raw else display_messages
+if len(cursors) > 1:
+    consume_partitions(StreamClient, stream_id, cursors, args.max_messages, args.follow, display)
+elif args.low_memory:
+    consume_low_memory(StreamClient, stream_id, cursors[0], args.max_messages, args.follow, args.raw)
+else:
+    consume(StreamClient, stream_id, cursors[0], args.max_messages, args.follow, display)
 
 # -- happy end
 exit (0)